@@ -28,6 +28,8 @@ def __init__(self, time_dim: str = "time"):
         self.time_range: tuple | None = None
         self._nested_dicts: dict[str, dict] = {}
         self._dataset_info: dict[str, dict] = {}  # stores dim info per dataset
+        # cached get_vars_with_qc_flags results
+        self._qc_flag_maps: dict[str, dict] = {}
     
     def _get_extra_dims(self, ds: xr.Dataset) -> list[str]:
         """Get extra dimensions (excluding time) for a Dataset."""
@@ -159,6 +161,7 @@ def add_dataset(
         
         self.datasets[name] = ds
         self._dataset_info[name] = ds_info
+        self.invalidate_qc_flag_map(name)
         
         # Generate nested dict for this dataset
         self._nested_dicts[name] = self._generate_nested_dict(ds, ds_info, name)
@@ -221,15 +224,17 @@ def _generate_nested_dict(self, ds: xr.Dataset, ds_info: dict, dataset_name: str
         elif shape_type == "time_plus_1":
             series_dim = ds_info["series_dim"]
             
+            # One reduction per variable instead of a .sel() per series value
+            present = {
+                var: self._presence_mask(ds, ds[var], [series_dim])
+                for var in valid_vars
+            }
+            
             # Check if the single extra dimension is "source"
             if series_dim == "source":
                 # Split by source, not by series - each source gets all variables
-                for source_val in ds[series_dim].values:
-                    source_key = self._to_python_type(source_val)
-                    vars_at_source = [
-                        var for var in valid_vars
-                        if not ds[var].sel({series_dim: source_val}).isnull().all()
-                    ]
+                for i, source_key in enumerate(ds[series_dim].values.tolist()):
+                    vars_at_source = [var for var in valid_vars if present[var][i]]
                     if vars_at_source:
                         nested_dict[source_key] = {"all": vars_at_source}
             else:
@@ -237,12 +242,8 @@ def _generate_nested_dict(self, ds: xr.Dataset, ds_info: dict, dataset_name: str
                 source_name = ds.attrs.get("source", dataset_name)
                 nested_dict[source_name] = {}
                 
-                for series_val in ds[series_dim].values:
-                    key = self._to_python_type(series_val)
-                    vars_at_series = [
-                        var for var in valid_vars
-                        if not ds[var].sel({series_dim: series_val}).isnull().all()
-                    ]
+                for i, key in enumerate(ds[series_dim].values.tolist()):
+                    vars_at_series = [var for var in valid_vars if present[var][i]]
                     if vars_at_series:
                         nested_dict[source_name][key] = vars_at_series
                 
@@ -254,18 +255,20 @@ def _generate_nested_dict(self, ds: xr.Dataset, ds_info: dict, dataset_name: str
             series_dim = ds_info["series_dim"]
             source_dim = ds_info["source_dim"]
             
-            for source_val in ds[source_dim].values:
-                source_key = self._to_python_type(source_val)
+            # (source, series) presence grid per variable, computed once
+            present = {
+                var: self._presence_mask(ds, ds[var], [source_dim, series_dim])
+                for var in valid_vars
+            }
+            
+            # .tolist() converts coordinate values to Python types in one call
+            series_keys = ds[series_dim].values.tolist()
+            
+            for i, source_key in enumerate(ds[source_dim].values.tolist()):
                 nested_dict[source_key] = {}
                 
-                for series_val in ds[series_dim].values:
-                    series_key = self._to_python_type(series_val)
-                    vars_at_slice = [
-                        var for var in valid_vars
-                        if not ds[var].sel(
-                            {source_dim: source_val, series_dim: series_val}
-                        ).isnull().all()
-                    ]
+                for j, series_key in enumerate(series_keys):
+                    vars_at_slice = [var for var in valid_vars if present[var][i, j]]
                     if vars_at_slice:
                         nested_dict[source_key][series_key] = vars_at_slice
                 
@@ -275,6 +278,21 @@ def _generate_nested_dict(self, ds: xr.Dataset, ds_info: dict, dataset_name: str
         
         return nested_dict
     
+    @staticmethod
+    def _presence_mask(ds: xr.Dataset, da: xr.DataArray, dims: list[str]):
+        """Return a boolean array over `dims` marking where `da` has any data.
+        
+        All other dimensions of `da` (including time) are reduced with a single
+        vectorized `notnull().any()`. Dimensions in `dims` that `da` does not
+        have are broadcast, so the result always has shape
+        `[ds.sizes[d] for d in dims]`.
+        """
+        present = da.notnull().any(dim=[d for d in da.dims if d not in dims])
+        for dim in dims:
+            if dim not in present.dims:
+                present = present.expand_dims({dim: ds.sizes[dim]})
+        return present.transpose(*dims).values
+    
     @staticmethod
     def _to_python_type(val):
         """Convert numpy types to Python types for use as dict keys."""
@@ -368,6 +386,9 @@ def get_series_data(
     def get_vars_with_qc_flags(self, name: str) -> dict[str, dict[str, bool]]:
         """Find variables that have an associated QC flag variable with valid data.
         
+        The result is cached per dataset, since it requires a null scan of
+        every QC flag variable.
+        
         Parameters
         ----------
         name : str
@@ -381,6 +402,9 @@ def get_vars_with_qc_flags(self, name: str) -> dict[str, dict[str, bool]]:
         if name not in self.datasets:
             raise KeyError(f"Dataset '{name}' not found.")
         
+        if name in self._qc_flag_maps:
+            return self._qc_flag_maps[name]
+        
         ds = self.datasets[name]
         ds_info = self._dataset_info[name]
         
@@ -445,6 +469,7 @@ def get_vars_with_qc_flags(self, name: str) -> dict[str, dict[str, bool]]:
                             result[source_key] = {}
                         result[source_key][var_name] = True
         
+        self._qc_flag_maps[name] = result
         return result
     
     def get_all_vars_with_qc_flags(self) -> dict[str, dict[str, dict[str, bool]]]:
@@ -457,6 +482,19 @@ def get_all_vars_with_qc_flags(self) -> dict[str, dict[str, dict[str, bool]]]:
         """
         return {name: self.get_vars_with_qc_flags(name) for name in self.datasets}
     
+    def invalidate_qc_flag_map(self, name: str) -> None:
+        """Drop the cached get_vars_with_qc_flags result of a dataset.
+        
+        Call this after replacing or modifying the dataset outside of
+        add_dataset.
+        
+        Parameters
+        ----------
+        name : str
+            Name of the dataset.
+        """
+        self._qc_flag_maps.pop(name, None)
+    
     def __repr__(self) -> str:
         datasets_info = ", ".join(self.datasets.keys()) if self.datasets else "None"
         time_info = f"{self.time_range}" if self.time_range else "Not set"
@@ -1,6 +1,11 @@
-import yaml
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+# Use the libyaml C implementation when PyYAML was built with it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CDumper", yaml.Dumper)
 
 class PanelSettingsManager:
     """Manages saving and loading of panel appearance settings."""
@@ -30,7 +35,9 @@ def save_panel_settings(self, panels_config: List[Dict[str, Any]], variable_colo
         }
         
         with open(self.settings_file, 'w') as f:
-            yaml.dump(settings, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(
+                settings, f, Dumper=Dumper, default_flow_style=False, sort_keys=False
+            )
     
     def load_panel_settings(self) -> Optional[Dict[str, Any]]:
         """
@@ -43,7 +50,7 @@ def load_panel_settings(self) -> Optional[Dict[str, Any]]:
             return None
         
         with open(self.settings_file, 'r') as f:
-            settings = yaml.safe_load(f)
+            settings = yaml.load(f, Loader=SafeLoader)
         
         return {
             'panels': settings.get('panels', []),
@@ -1,6 +1,14 @@
 import tkinter as tk
+from functools import partial
+from tkinter import font as tkfont
 from tkinter import ttk
 
+import numpy as np
+
+CHECKED = "\u2611"
+UNCHECKED = "\u2610"
+INVALID = "-"
+
 
 class SelectionDialog(tk.Toplevel):
     """Dialog for selecting variables at different heights per source."""
@@ -18,12 +26,28 @@ def __init__(self, parent, source_z_vars: dict, qc_map: dict, on_confirm,
         self._on_confirm = on_confirm
         self._show_clip_option = show_clip_option
         self._dataset_name = dataset_name
-        self._checkbox_vars: dict[str, dict[str, dict[str, tk.BooleanVar]]] = {}
         self._clip_var: tk.BooleanVar = tk.BooleanVar(value=True)
         
-        # Master controls for variables and heights per source
-        self._var_master_checkboxes: dict[str, dict[str, tk.BooleanVar]] = {}
-        self._height_master_checkboxes: dict[str, dict[str, tk.BooleanVar]] = {}
+        # Fonts are resolved once and shared by all widgets of the dialog
+        self._font = tkfont.Font(self, family="Arial", size=9)
+        self._small_font = tkfont.Font(self, family="Arial", size=8)
+        self._header_font = tkfont.Font(self, family="Arial", size=10, weight="bold")
+        
+        # Selection state per source as bool arrays of shape (n_vars, n_heights);
+        # valid marks the (var, height) combinations that exist in the dataset
+        self._state: dict[str, np.ndarray] = {}
+        self._valid: dict[str, np.ndarray] = {}
+        # Row and column labels per source: source -> (all_vars, all_heights)
+        self._grids: dict[str, tuple[list, list]] = {}
+        # QC companion per variable row (None if the variable has no QC flag)
+        self._qc_vars: dict[str, list[str | None]] = {}
+        # Treeviews exist only for sources whose tab has been shown
+        self._trees: dict[str, ttk.Treeview] = {}
+        self._tab_sources: dict[str, str] = {}  # tab widget path -> source
+        
+        # Sources whose Treeview needs redrawing, flushed once when Tk is idle
+        self._pending_refresh: set[str] = set()
+        self._refresh_after_id: str | None = None
         
         self._construct_dialog()
     
@@ -31,28 +55,7 @@ def _construct_dialog(self):
         """Build dialog components."""
         # Clip option at top (only for second+ datasets)
         if self._show_clip_option:
-            clip_frame = tk.Frame(self)
-            clip_frame.pack(fill="x", padx=10, pady=(10, 5))
-            
-            tk.Label(
-                clip_frame, 
-                text=f"Dataset: {self._dataset_name}", 
-                font=("Arial", 10, "bold")
-            ).pack(side="left", padx=(0, 10))
-            
-            tk.Checkbutton(
-                clip_frame,
-                text="Clip to reference time range",
-                variable=self._clip_var,
-                font=("Arial", 9)
-            ).pack(side="left")
-            
-            tk.Label(
-                clip_frame,
-                text="(from first loaded dataset)",
-                font=("Arial", 8),
-                fg="gray"
-            ).pack(side="left", padx=(5, 0))
+            self._build_clip_header()
         
         # Select All / Unselect All buttons
         btn_top_frame = tk.Frame(self)
@@ -62,113 +65,51 @@ def _construct_dialog(self):
             btn_top_frame, 
             text="Select All", 
             command=self._select_all,
-            font=("Arial", 9)
+            font=self._font
         ).pack(side=tk.LEFT, padx=5)
         
         tk.Button(
             btn_top_frame, 
             text="Unselect All", 
             command=self._unselect_all,
-            font=("Arial", 9)
+            font=self._font
         ).pack(side=tk.LEFT, padx=5)
         
-        container = tk.Frame(self)
-        container.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        scroll_canvas = tk.Canvas(container)
-        v_scrollbar = ttk.Scrollbar(container, orient="vertical", command=scroll_canvas.yview)
-        h_scrollbar = ttk.Scrollbar(container, orient="horizontal", command=scroll_canvas.xview)
+        # One notebook tab per source; tab contents are built on first display
+        self._notebook = ttk.Notebook(self)
+        self._notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        self._notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
-        inner_frame = tk.Frame(scroll_canvas)
-        inner_frame.bind("<Configure>", lambda e: scroll_canvas.configure(scrollregion=scroll_canvas.bbox("all")))
-        
-        scroll_canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-        scroll_canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        v_scrollbar.pack(side="right", fill="y")
-        h_scrollbar.pack(side="bottom", fill="x")
-        scroll_canvas.pack(side="left", fill="both", expand=True)
-        
-        current_row = 0
         for source, z_vars in self._source_z_vars.items():
             if not z_vars:
                 continue
             
-            src_label = tk.Label(inner_frame, text=f"Source: {source}", font=("Arial", 11, "bold"))
-            src_label.grid(row=current_row, column=0, sticky="w", pady=(15, 5), columnspan=2)
-            current_row += 1
-            
             all_heights = sorted(z_vars.keys())
             all_vars = sorted(set(v for var_list in z_vars.values() for v in var_list))
             
             if not all_vars or not all_heights:
                 continue
             
-            self._checkbox_vars[source] = {}
-            self._var_master_checkboxes[source] = {}
-            self._height_master_checkboxes[source] = {}
-            
-            # Header row with master height checkboxes
-            tk.Label(inner_frame, text="Variable \\ Height", relief="ridge", width=18).grid(
-                row=current_row, column=0, sticky="nsew"
+            self._grids[source] = (all_vars, all_heights)
+            # Hash each height's variable list once instead of scanning it per cell
+            valid_sets = [frozenset(z_vars[h]) for h in all_heights]
+            valid = np.array(
+                [[var in vars_at_h for vars_at_h in valid_sets] for var in all_vars],
+                dtype=bool,
             )
-            tk.Label(inner_frame, text="All", relief="ridge", width=4).grid(
-                row=current_row, column=1, sticky="nsew"
-            )
-            
-            for col_idx, h in enumerate(all_heights, start=2):
-                # Create master checkbox for this height
-                height_master_var = tk.BooleanVar(value=True)
-                self._height_master_checkboxes[source][h] = height_master_var
-                
-                # Frame to hold label and checkbox
-                height_frame = tk.Frame(inner_frame, relief="ridge", borderwidth=1)
-                height_frame.grid(row=current_row, column=col_idx, sticky="nsew")
-                
-                tk.Label(height_frame, text=str(h), width=8).pack()
-                tk.Checkbutton(
-                    height_frame, 
-                    variable=height_master_var,
-                    command=lambda s=source, ht=h: self._toggle_height(s, ht)
-                ).pack()
+            self._valid[source] = valid
+            self._state[source] = valid.copy()  # Default to selected
+            qc_flags = self._qc_map.get(source, {})
+            self._qc_vars[source] = [
+                f"{var}_qcflag" if qc_flags.get(var) else None for var in all_vars
+            ]
             
-            current_row += 1
-            
-            # Variable rows with master variable checkboxes
-            for var in all_vars:
-                tk.Label(inner_frame, text=var, relief="ridge", width=18, anchor="w").grid(
-                    row=current_row, column=0, sticky="nsew"
-                )
-                
-                # Master checkbox for this variable
-                var_master_var = tk.BooleanVar(value=True)
-                self._var_master_checkboxes[source][var] = var_master_var
-                tk.Checkbutton(
-                    inner_frame, 
-                    variable=var_master_var,
-                    command=lambda s=source, v=var: self._toggle_variable(s, v)
-                ).grid(row=current_row, column=1, sticky="nsew")
-                
-                self._checkbox_vars[source][var] = {}
-                
-                for col_idx, h in enumerate(all_heights, start=2):
-                    is_valid = var in z_vars.get(h, [])
-                    
-                    if is_valid:
-                        bool_var = tk.BooleanVar(value=True)  # Default to selected
-                        self._checkbox_vars[source][var][h] = bool_var
-                        cb = tk.Checkbutton(
-                            inner_frame, 
-                            variable=bool_var,
-                            command=lambda s=source: self._update_master_checkboxes(s)
-                        )
-                        cb.grid(row=current_row, column=col_idx, sticky="nsew")
-                    else:
-                        tk.Label(inner_frame, text="-", relief="flat").grid(
-                            row=current_row, column=col_idx, sticky="nsew"
-                        )
-                
-                current_row += 1
+            tab = tk.Frame(self._notebook)
+            self._notebook.add(tab, text=f"Source: {source}")
+            self._tab_sources[str(tab)] = source
+        
+        # Build the initially selected tab right away
+        self._on_tab_changed()
         
         btn_frame = tk.Frame(self)
         btn_frame.pack(fill="x", padx=10, pady=10)
@@ -176,92 +117,201 @@ def _construct_dialog(self):
         tk.Button(btn_frame, text="Confirm Selection", command=self._confirm_selection).pack(side="left", padx=5)
         tk.Button(btn_frame, text="Cancel", command=self.destroy).pack(side="left", padx=5)
     
+    def _build_clip_header(self):
+        """Build the dataset label and clip-to-reference-range option."""
+        clip_frame = tk.Frame(self)
+        clip_frame.pack(fill="x", padx=10, pady=(10, 5))
+        
+        tk.Label(
+            clip_frame, 
+            text=f"Dataset: {self._dataset_name}", 
+            font=self._header_font
+        ).pack(side="left", padx=(0, 10))
+        
+        tk.Checkbutton(
+            clip_frame,
+            text="Clip to reference time range",
+            variable=self._clip_var,
+            font=self._font
+        ).pack(side="left")
+        
+        tk.Label(
+            clip_frame,
+            text="(from first loaded dataset)",
+            font=self._small_font,
+            fg="gray"
+        ).pack(side="left", padx=(5, 0))
+    
+    def _on_tab_changed(self, event=None):
+        """Build the Treeview of the selected source the first time it is shown."""
+        selected = self._notebook.select()
+        source = self._tab_sources.get(selected)
+        if source is None or source in self._trees:
+            return
+        self._build_source_section(source, self._notebook.nametowidget(selected))
+    
+    def _build_source_section(self, source: str, tab: tk.Frame):
+        """Create the Treeview for one source inside its notebook tab."""
+        all_vars, all_heights = self._grids[source]
+        
+        # One Treeview per source: rows are variables, columns are heights.
+        # Treeview only renders visible rows, so no widget is created per cell.
+        height_cols = [f"h{j}" for j in range(len(all_heights))]
+        tree = ttk.Treeview(
+            tab,
+            columns=["all"] + height_cols,
+            show="tree headings",
+            selectmode="none",
+        )
+        tree.heading("#0", text="Variable \\ Height", anchor="w")
+        tree.column("#0", width=160, stretch=False)
+        tree.heading("all", text="All")
+        tree.column("all", width=40, anchor="center", stretch=False)
+        for j, col in enumerate(height_cols):
+            tree.heading(col, command=partial(self._toggle_height, source, j))
+            tree.column(col, width=70, anchor="center", stretch=False)
+        
+        for i, var in enumerate(all_vars):
+            tree.insert("", "end", iid=str(i), text=var)
+        
+        tree.bind("<Button-1>", partial(self._on_cell_click, source))
+        
+        # Fill in all cell values while the tree is still unmapped, so it is
+        # laid out and drawn once when packed
+        self._trees[source] = tree
+        self._refresh_source(source)
+        
+        v_scrollbar = ttk.Scrollbar(tab, orient="vertical", command=tree.yview)
+        h_scrollbar = ttk.Scrollbar(tab, orient="horizontal", command=tree.xview)
+        tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        
+        v_scrollbar.pack(side="right", fill="y")
+        h_scrollbar.pack(side="bottom", fill="x")
+        tree.pack(side="left", fill="both", expand=True)
+    
+    def _refresh_source(self, source: str):
+        """Redraw cell marks and master states of one source's Treeview."""
+        tree = self._trees[source]
+        _, all_heights = self._grids[source]
+        state = self._state[source]
+        valid = self._valid[source]
+        
+        # A master is checked only if all valid cells in its row/column are checked
+        checked = state | ~valid
+        var_masters = checked.all(axis=1)
+        height_masters = checked.all(axis=0)
+        marks = np.where(valid, np.where(state, CHECKED, UNCHECKED), INVALID)
+        
+        for i, (master, cells) in enumerate(zip(var_masters.tolist(), marks.tolist())):
+            tree.item(str(i), values=[CHECKED if master else UNCHECKED] + cells)
+        
+        for j, (master, h) in enumerate(zip(height_masters.tolist(), all_heights)):
+            tree.heading(f"h{j}", text=f"{CHECKED if master else UNCHECKED} {h}")
+    
+    def _schedule_refresh(self, source: str):
+        """Queue a Treeview redraw for source, coalescing repeated requests."""
+        self._pending_refresh.add(source)
+        if self._refresh_after_id is None:
+            self._refresh_after_id = self.after_idle(self._flush_refresh)
+    
+    def _flush_refresh(self):
+        """Redraw every Treeview queued since the last flush."""
+        self._refresh_after_id = None
+        pending = self._pending_refresh
+        self._pending_refresh = set()
+        for source in pending:
+            if source in self._trees:
+                self._refresh_source(source)
+    
+    def _on_cell_click(self, source: str, event):
+        """Toggle the cell (or the variable master) under the mouse pointer."""
+        tree = self._trees[source]
+        if tree.identify_region(event.x, event.y) != "cell":
+            return
+        
+        row = tree.identify_row(event.y)
+        column = tree.identify_column(event.x)
+        if not row or column == "#0":
+            return
+        
+        i = int(row)
+        col_idx = int(column[1:]) - 1
+        
+        if col_idx == 0:
+            self._toggle_variable(source, i)
+            return
+        
+        j = col_idx - 1
+        if not self._valid[source][i, j]:
+            return
+        
+        self._state[source][i, j] = not self._state[source][i, j]
+        self._schedule_refresh(source)
+    
+    def _set_all(self, selected: bool):
+        """Set every valid cell of every source to selected."""
+        for source, state in self._state.items():
+            state[:] = self._valid[source] if selected else False
+        
+        for source in self._trees:
+            self._schedule_refresh(source)
+    
     def _select_all(self):
         """Select all checkboxes."""
-        for source in self._checkbox_vars:
-            for var in self._checkbox_vars[source]:
-                for h in self._checkbox_vars[source][var]:
-                    self._checkbox_vars[source][var][h].set(True)
-            
-            # Update master checkboxes
-            for var in self._var_master_checkboxes.get(source, {}):
-                self._var_master_checkboxes[source][var].set(True)
-            for h in self._height_master_checkboxes.get(source, {}):
-                self._height_master_checkboxes[source][h].set(True)
+        self._set_all(True)
     
     def _unselect_all(self):
         """Unselect all checkboxes."""
-        for source in self._checkbox_vars:
-            for var in self._checkbox_vars[source]:
-                for h in self._checkbox_vars[source][var]:
-                    self._checkbox_vars[source][var][h].set(False)
-            
-            # Update master checkboxes
-            for var in self._var_master_checkboxes.get(source, {}):
-                self._var_master_checkboxes[source][var].set(False)
-            for h in self._height_master_checkboxes.get(source, {}):
-                self._height_master_checkboxes[source][h].set(False)
+        self._set_all(False)
     
-    def _toggle_variable(self, source: str, var: str):
-        """Toggle all heights for a specific variable."""
-        new_state = self._var_master_checkboxes[source][var].get()
-        
-        for h in self._checkbox_vars[source][var]:
-            self._checkbox_vars[source][var][h].set(new_state)
+    def _toggle_variable(self, source: str, row: int):
+        """Toggle all heights for the variable at row."""
+        valid = self._valid[source][row]
+        state = self._state[source][row]
+        state[valid] = not state[valid].all()
         
-        # Update height master checkboxes
-        self._update_master_checkboxes(source)
+        self._schedule_refresh(source)
     
-    def _toggle_height(self, source: str, height):
-        """Toggle all variables for a specific height."""
-        new_state = self._height_master_checkboxes[source][height].get()
+    def _toggle_height(self, source: str, col: int):
+        """Toggle all variables for the height at col."""
+        valid = self._valid[source][:, col]
+        state = self._state[source][:, col]
+        state[valid] = not state[valid].all()
         
-        for var in self._checkbox_vars[source]:
-            if height in self._checkbox_vars[source][var]:
-                self._checkbox_vars[source][var][height].set(new_state)
-        
-        # Update variable master checkboxes
-        self._update_master_checkboxes(source)
+        self._schedule_refresh(source)
     
-    def _update_master_checkboxes(self, source: str):
-        """Update master checkboxes based on individual checkbox states."""
-        # Update variable master checkboxes
-        for var in self._var_master_checkboxes.get(source, {}):
-            if var in self._checkbox_vars[source]:
-                states = [cb.get() for cb in self._checkbox_vars[source][var].values()]
-                if states:
-                    # Set to True only if all are True
-                    self._var_master_checkboxes[source][var].set(all(states))
-        
-        # Update height master checkboxes
-        for h in self._height_master_checkboxes.get(source, {}):
-            states = []
-            for var in self._checkbox_vars[source]:
-                if h in self._checkbox_vars[source][var]:
-                    states.append(self._checkbox_vars[source][var][h].get())
-            if states:
-                # Set to True only if all are True
-                self._height_master_checkboxes[source][h].set(all(states))
+    def destroy(self):
+        """Cancel a pending redraw before destroying the dialog."""
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        super().destroy()
     
     def _confirm_selection(self):
         """Gather selections and invoke callback."""
         final_selection = {}
         
-        for source, var_heights in self._checkbox_vars.items():
+        for source, (all_vars, all_heights) in self._grids.items():
             final_selection[source] = {}
+            qc_vars = self._qc_vars[source]
+            seen = {}  # height -> set of names already in its list
             
-            for var, height_bools in var_heights.items():
-                for h, bool_var in height_bools.items():
-                    if bool_var.get():
-                        if h not in final_selection[source]:
-                            final_selection[source][h] = []
-                        
-                        final_selection[source][h].append(var)
-                        
-                        if self._qc_map.get(source, {}).get(var):
-                            qc_var = f"{var}_qcflag"
-                            if qc_var not in final_selection[source][h]:
-                                final_selection[source][h].append(qc_var)
+            # Selected cells in row-major (variable, then height) order
+            rows, cols = np.nonzero(self._state[source])
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                h = all_heights[j]
+                if h not in final_selection[source]:
+                    final_selection[source][h] = []
+                    seen[h] = set()
+                
+                var = all_vars[i]
+                final_selection[source][h].append(var)
+                seen[h].add(var)
+                
+                qc_var = qc_vars[i]
+                if qc_var is not None and qc_var not in seen[h]:
+                    final_selection[source][h].append(qc_var)
+                    seen[h].add(qc_var)
         
         # Include clip option in callback
         clip_to_range = self._clip_var.get() if self._show_clip_option else False
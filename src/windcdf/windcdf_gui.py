@@ -1,22 +1,33 @@
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, filedialog, messagebox, colorchooser
 import os
+from concurrent.futures import ThreadPoolExecutor
 import xarray as xr
 import numpy as np
-import random
 import yaml
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import pandas as pd
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.widgets import SpanSelector
+from matplotlib.patches import Rectangle
 
 from datamanager import DatasetManager
 from selection_dialog import SelectionDialog
 
 from panel_settings import PanelSettingsManager
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Final, Hashable, Optional
+
+# Use the libyaml C implementation when PyYAML was built with it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Name suffix of the QC flag variable that belongs to a data variable
+QCFLAG_SUFFIX = "_qcflag"
+
+# Save with netCDF4, the declared NetCDF dependency
+NETCDF_ENGINE: Final = "netcdf4"
 
 class WindCDF_GUI(tk.Frame):
     """Graphical User Interface for timer series plot and quality control of NetCDF datasets."""
@@ -29,15 +40,34 @@ def __init__(self, master=None, num_panels: int | None = None, minsize: int | No
         
         self._manager = DatasetManager()
         self._user_selections: dict[str, dict] = {}  # source -> z -> [vars]
+        # source -> dataset names holding it, in load order
+        self._source_datasets: dict[str, list[str]] = {}
+        # source -> selected non-QC vars
+        self._selected_data_vars: dict[str, set[str]] = {}
         self._plot_config: dict = {}  # (source, z, var) -> {color, panels: [bool, bool, bool]}
+        # (source, z, var) shown on at least one panel
+        self._plotted_keys: set[tuple] = set()
         self._last_loaded_dataset: str | None = None
         self._dataset_count: int = 0  # Track number of loaded datasets
         
         # Cache for split datasets: source -> {time: array, vars: {var: {z: array}}}
         self._source_data_cache: dict[str, dict] = {}
         
+        # Memo of _get_cached_data results: (source, z, var) -> (time, data, qc_data).
+        # Entries are dropped whenever the arrays behind a key are replaced.
+        self._cached_data_memo: dict[tuple, tuple] = {}
+        # Sample indices of each QC marker group:
+        # (source, z, var) -> [indices per group].
+        # Entries are dropped when the QC flags of a key are refreshed.
+        self._qc_group_memo: dict[tuple, list] = {}
+        # Converted time axes: (dtype, shape, first, last) -> (raw, time, sorted, range)
+        self._time_conv_cache: dict[tuple, tuple] = {}
+        
         # Store line references for efficient updates
-        self._plot_lines: dict[tuple, list] = {}  # (source, z, var, panel_idx) -> [line, scatter]
+        # (source, z, var, panel_idx) -> [line, scatter per marker group]
+        self._plot_lines: dict[tuple, list] = {}
+        # x-range the lines were last decimated for
+        self._decimated_xlim: tuple[float, float] | None = None
         
         # Load settings
         self._settings = self._load_settings(None)
@@ -51,6 +81,7 @@ def __init__(self, master=None, num_panels: int | None = None, minsize: int | No
         self._left_panel_minsize = minsize if minsize is not None else left_panel_settings.get("minsize", 180)
         self._left_panel_width = width if width is not None else left_panel_settings.get("width", 260)
         self._status_mapping_config = self._settings.get("status_mapping", {})
+        self._date_format = self._settings.get("date_formatter", "%Y-%m-%d\n%H:%M")
         
 
         # Y-range controls per panel (dynamic based on number of panels)
@@ -62,21 +93,49 @@ def __init__(self, master=None, num_panels: int | None = None, minsize: int | No
         self._time_min_num: float | None = None
         self._time_max_num: float | None = None
         self._window_var = tk.StringVar(value="1.0")
+        # Pending [after id, latest value] per slider handler, applied at most
+        # every 16 ms
+        self._slider_pending: dict = {}
+        # Set while a time-control sync after line toggles is scheduled
+        self._line_refresh_pending = False
         
         # Selection & QC controls (dynamic based on number of panels)
         self._span_selectors: list[SpanSelector | None] = [None] * self._num_panels
         self._current_selection: tuple[float, float] | None = None
         self._selection_patches: list = [None] * self._num_panels
+        self._selection_backgrounds: list = [None] * self._num_panels
         self._status_var = tk.StringVar()
         
         # QC apply selection: (source, z, var) -> BooleanVar
         self._qc_apply_vars: dict[tuple, tk.BooleanVar] = {}
+        # (source, var) entries of the variable panel whose height rows are shown
+        self._expanded_vars: set[tuple] = set()
         
         # Undo state: source -> var -> z -> backup array
         self._last_qc_backup: dict[str, dict[str, dict]] = {}
         
+        # Line colors are drawn in batches from a seeded generator
+        self._rng = np.random.default_rng(0)
+        self._color_pool: list[str] = []
+        
         # Build status mapping for dropdown
         self._status_mapping = self._build_status_mapping()
+        # QC marker styles, fixed once settings are loaded
+        self._marker_groups, self._marker_lut = self._build_marker_groups()
+        # CF flag attributes written to every QC variable created on save; codes
+        # that do not fit in int8 were dropped by _build_status_mapping
+        self._qc_flag_values = tuple(self._status_mapping.values())
+        self._qc_flag_meanings = ' '.join(
+            info['label'].replace(' ', '_')
+            for info in self._status_mapping_config.values()
+        )
+        
+        # Background worker for NetCDF reads, so the Tk event loop keeps running
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        
+        # Dataset selection dialog for saving, built lazily and reused
+        self._save_dialog: tk.Toplevel | None = None
+        self._save_dialog_result: str | None = None
         
         self._build_ui()
     
@@ -91,7 +150,7 @@ def _load_settings(self, path: str | None) -> dict:
         if path and os.path.exists(path):
             try:
                 with open(path, "r") as f:
-                    config = yaml.safe_load(f)
+                    config = yaml.load(f, Loader=SafeLoader)
                     if config:
                         return config
                     else:
@@ -102,13 +161,60 @@ def _load_settings(self, path: str | None) -> dict:
         raise FileNotFoundError("settings.yaml not found. Please provide a valid settings file.")
     
     def _build_status_mapping(self) -> dict:
-        """Build status mapping for dropdown from settings config."""
+        """Build status mapping for dropdown from settings config.
+        
+        Codes that do not fit in the int8 QC arrays are reported and dropped
+        from the config, so no other part of the GUI uses them.
+        """
         mapping = {}
+        valid_config = {}
+        invalid_codes = []
+        int8_info = np.iinfo(np.int8)
         for code, info in self._status_mapping_config.items():
+            if not int8_info.min <= int(code) <= int8_info.max:
+                invalid_codes.append(str(code))
+                continue
+            valid_config[code] = info
             label = info.get("label", str(code))
             mapping[f"{label} ({code})"] = int(code)
+        
+        if invalid_codes:
+            messagebox.showerror(
+                "Settings Error",
+                f"Status codes {', '.join(invalid_codes)} do not fit in int8 QC "
+                f"arrays ({int8_info.min} to {int8_info.max}) and are ignored.",
+            )
+            self._status_mapping_config = valid_config
         return mapping
     
+    def _build_marker_groups(self) -> tuple[list, np.ndarray]:
+        """Group QC codes by marker style and build the int8 code lookup table.
+        
+        Returns a list of ((color, edgecolor), codes) with codes as an int8
+        array, and a 256-entry table mapping a code's byte to its group index
+        (255 for codes without a marker).
+        """
+        groups: dict[tuple, list[int]] = {}
+        for code, info in self._status_mapping_config.items():
+            marker = info.get("marker")
+            if marker is None:
+                continue
+            
+            # Create a hashable key from marker properties
+            color = marker.get("color", "black")
+            edgecolor = marker.get("edgecolor", color)
+            groups.setdefault((color, edgecolor), []).append(int(code))
+        
+        marker_groups = [
+            (key, np.asarray(codes, dtype=np.int8)) for key, codes in groups.items()
+        ]
+        
+        lut = np.full(256, 255, dtype=np.uint8)
+        for gid, (_, codes) in enumerate(marker_groups):
+            lut[codes.view(np.uint8)] = gid
+        
+        return marker_groups, lut
+    
     def _build_ui(self):
         """Build the main user interface."""
         # Add menu bar first
@@ -118,6 +224,7 @@ def _build_ui(self):
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        self._file_menu = file_menu
         file_menu.add_command(label="Load Dataset", command=self._load_dataset_from_file)
         file_menu.add_command(label="Save Dataset", command=self._save_dataset_to_file)
         file_menu.add_separator()
@@ -153,6 +260,11 @@ def _build_left_panel(self, parent):
         control_frame = tk.Frame(parent)
         control_frame.pack(fill="x", padx=5, pady=5)
         
+        # Shown only while a dataset is being read in the background
+        self._load_progress = ttk.Progressbar(
+            control_frame, mode="indeterminate", length=120
+        )
+        
         # self._load_btn = tk.Button(
         #     control_frame, 
         #     text="Load Dataset",
@@ -217,6 +329,28 @@ def _build_plot_area(self, parent):
         # Initialize span selectors
         self._init_span_selectors()
         
+        # Lines are re-decimated for every new x-range (zoom, pan, slider)
+        # and for every new canvas size
+        for ax in self.axes:
+            ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self.canvas.mpl_connect("resize_event", self._on_canvas_resize)
+        
+        # Persistent selection highlight per panel, drawn by blitting
+        for i, ax in enumerate(self.axes):
+            patch = Rectangle(
+                (0, 0), 0, 1,
+                transform=ax.get_xaxis_transform(),
+                alpha=0.3,
+                color="yellow",
+                visible=False,
+                animated=True,
+            )
+            # add_artist rather than add_patch so the highlight never affects
+            # data limits
+            ax.add_artist(patch)
+            self._selection_patches[i] = patch
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
+        
         self.canvas.draw()
     
     def _build_qc_controls(self, parent):
@@ -357,11 +491,14 @@ def _build_time_controls(self, parent):
             to=1000,
             orient=tk.HORIZONTAL,
             showvalue=False,
-            command=self._on_time_slider_move,
+            command=partial(self._throttle_slider, self._on_time_slider_move),
             length=200
         )
         self._time_slider.set(0)
         self._time_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+        self._time_slider.bind(
+            "<ButtonRelease-1>", lambda e: self._flush_slider(self._on_time_slider_move)
+        )
         
         # Right arrow
         self._btn_right = tk.Button(
@@ -385,11 +522,15 @@ def _build_time_controls(self, parent):
             to=100,
             orient=tk.HORIZONTAL,
             showvalue=True,
-            command=self._on_window_slider_move,
+            command=partial(self._throttle_slider, self._on_window_slider_move),
             length=100
         )
         self._window_slider.set(100)
         self._window_slider.pack(side=tk.LEFT, padx=2)
+        self._window_slider.bind(
+            "<ButtonRelease-1>",
+            lambda e: self._flush_slider(self._on_window_slider_move),
+        )
         
         self._window_entry = tk.Entry(time_ctrl, width=6, textvariable=self._window_var, font=("Arial", 8))
         self._window_entry.pack(side=tk.LEFT, padx=2)
@@ -408,7 +549,7 @@ def _apply_datetime_formatting(self):
         """Apply datetime formatting to all axes."""
         for ax in self.axes:
             # Use custom date formatter with smaller font
-            formatter = mdates.DateFormatter(self._settings.get("date_formatter", "%Y-%m-%d\n%H:%M"))
+            formatter = mdates.DateFormatter(self._date_format)
             ax.xaxis.set_major_formatter(formatter)
             ax.xaxis.set_major_locator(mdates.AutoDateLocator())
             ax.xaxis.set_minor_locator(mdates.AutoDateLocator(minticks=2, maxticks=10))
@@ -435,7 +576,11 @@ def _deselect_all_for_qc(self):
     # ---------- SPAN SELECTION ----------
     
     def _init_span_selectors(self):
-        """Initialize span selectors for each panel."""
+        """Initialize span selectors for each panel.
+        
+        Called once when the figure is built; the selectors stay attached to
+        their axes, so adding or removing lines does not require new ones.
+        """
         for i, ax in enumerate(self.axes):
             if self._span_selectors[i] is not None:
                 self._span_selectors[i].disconnect_events()
@@ -462,39 +607,25 @@ def _on_select_span(self, panel_idx: int, tmin: float, tmax: float):
         except Exception:
             self._selection_lbl.config(text=f"Selected: {tmin:.2f} → {tmax:.2f}")
         
-        # Clear previous selection patches
-        for i, patch in enumerate(self._selection_patches):
-            if patch is not None:
-                try:
-                    patch.remove()
-                except Exception:
-                    pass
-                self._selection_patches[i] = None
-        
-        # Draw highlight on all panels
-        for i, ax in enumerate(self.axes):
-            self._selection_patches[i] = ax.axvspan(
-                tmin, tmax, alpha=0.3, color="yellow"
-            )
+        # Move the highlight on all panels
+        for patch in self._selection_patches:
+            patch.set_x(tmin)
+            patch.set_width(tmax - tmin)
+            patch.set_visible(True)
         
         # Enable apply button
         self._btn_apply_status.config(state="normal")
         
-        self.canvas.draw_idle()
+        self._blit_selection()
     
     def _clear_selection(self):
         """Clear the current selection."""
         self._current_selection = None
         self._selection_lbl.config(text="")
         
-        # Remove yellow highlight patches
-        for i, patch in enumerate(self._selection_patches):
-            if patch is not None:
-                try:
-                    patch.remove()
-                except Exception:
-                    pass
-                self._selection_patches[i] = None
+        # Hide yellow highlight patches
+        for patch in self._selection_patches:
+            patch.set_visible(False)
         
         # Clear the SpanSelector's visible selection on all panels
         for i, selector in enumerate(self._span_selectors):
@@ -503,7 +634,34 @@ def _clear_selection(self):
                 selector.update()
         
         self._btn_apply_status.config(state="disabled")
-        self.canvas.draw_idle()
+        self._blit_selection()
+    
+    def _on_canvas_draw(self, event):
+        """Cache panel backgrounds after a full draw and overlay the selection."""
+        for i, ax in enumerate(self.axes):
+            self._selection_backgrounds[i] = self.canvas.copy_from_bbox(ax.bbox)
+            patch = self._selection_patches[i]
+            if patch.get_visible():
+                ax.draw_artist(patch)
+    
+    def _blit_selection(self):
+        """Redraw only the selection overlays on top of the cached backgrounds."""
+        if any(bg is None for bg in self._selection_backgrounds):
+            self.canvas.draw_idle()
+            return
+        
+        for i, ax in enumerate(self.axes):
+            self.canvas.restore_region(self._selection_backgrounds[i])
+            patch = self._selection_patches[i]
+            if patch.get_visible():
+                ax.draw_artist(patch)
+            # Keep the interactive span of the selector on top
+            selector = self._span_selectors[i]
+            if selector is not None:
+                for artist in selector.artists:
+                    if artist.get_visible():
+                        ax.draw_artist(artist)
+            self.canvas.blit(ax.bbox)
     
     # ---------- QC STATUS APPLICATION ----------
     
@@ -524,13 +682,10 @@ def _apply_status_to_selection(self):
         # 1. Being plotted (at least one panel checked)
         # 2. Selected for QC apply (checkbox checked)
         active_keys = set()
-        for (source, z, var), config in self._plot_config.items():
-            if var.endswith("_qcflag"):
-                continue
-            if not any(config["panels"]):
+        for key in self._plotted_keys:
+            if key[2].endswith(QCFLAG_SUFFIX):
                 continue
             # Check if selected for QC apply
-            key = (source, z, var)
             if key in self._qc_apply_vars and self._qc_apply_vars[key].get():
                 active_keys.add(key)
         
@@ -543,57 +698,115 @@ def _apply_status_to_selection(self):
         self._last_qc_backup.clear()
         
         changes_made = 0
+        changed_keys = set()
         
+        keys_by_source: dict[str, dict] = {}
         for source, z, var in active_keys:
-            qc_var = f"{var}_qcflag"
-            
+            keys_by_source.setdefault(source, {}).setdefault(var, []).append(z)
+        
+        for source, var_zs in keys_by_source.items():
             # Check if QC data exists in cache
             if source not in self._source_data_cache:
                 continue
             
             source_cache = self._source_data_cache[source]
             
-            if qc_var not in source_cache["vars"] or z not in source_cache["vars"][qc_var]:
-                # Create QC array if it doesn't exist
-                if var in source_cache["vars"] and z in source_cache["vars"][var]:
-                    data_shape = source_cache["vars"][var][z].shape
-                    if qc_var not in source_cache["vars"]:
-                        source_cache["vars"][qc_var] = {}
-                    source_cache["vars"][qc_var][z] = np.ones(data_shape, dtype=int)  # Default to 1 (Auto-Pass)
-            
-            if qc_var not in source_cache["vars"] or z not in source_cache["vars"][qc_var]:
-                continue
-            
-            # Backup
-            if source not in self._last_qc_backup:
-                self._last_qc_backup[source] = {}
-            if var not in self._last_qc_backup[source]:
-                self._last_qc_backup[source][var] = {}
-            
-            self._last_qc_backup[source][var][z] = source_cache["vars"][qc_var][z].copy()
-            
-            # Get time array and find indices in selection
-            time = source_cache["time"]
-            
-            if np.issubdtype(time.dtype, np.datetime64):
-                tnum = mdates.date2num(pd.to_datetime(time))
+            # Time is cached as Matplotlib date numbers at load time, and the
+            # selected samples are the same for every variable of a source
+            tnum = source_cache["time"]
+            if source_cache.get("time_sorted"):
+                # Selection is a contiguous block of samples
+                i0 = np.searchsorted(tnum, tmin, side="left")
+                i1 = np.searchsorted(tnum, tmax, side="right")
+                selection = slice(i0, i1)
+                n_selected = max(int(i1 - i0), 0)
             else:
-                tnum = time.astype(float)
-            
-            mask = (tnum >= tmin) & (tnum <= tmax)
-            
-            if mask.any():
-                source_cache["vars"][qc_var][z][mask] = status_code
-                changes_made += mask.sum()
+                selection = (tnum >= tmin) & (tnum <= tmax)
+                n_selected = int(selection.sum())
+            
+            source_backup = self._last_qc_backup.setdefault(source, {})
+            
+            for var, zs in var_zs.items():
+                qc_rows = {}
+                for z in zs:
+                    qc_array, created = self._ensure_qc_array(source_cache, var, z)
+                    if qc_array is None:
+                        continue
+                    # Memo entries of newly created QC arrays still hold qc_data=None
+                    for cz in created:
+                        self._cached_data_memo.pop((source, cz, var), None)
+                    
+                    # Backup
+                    source_backup.setdefault(var, {})[z] = qc_array.copy()
+                    qc_rows[z] = qc_array
+                
+                if not n_selected or not qc_rows:
+                    continue
+                
+                # Flag all heights at once when they are rows of one QC matrix
+                qc_var = f"{var}{QCFLAG_SUFFIX}"
+                qc_matrix = source_cache["matrix"].get(qc_var)
+                z_index = source_cache["z_index"].get(qc_var, {})
+                if (
+                    len(qc_rows) > 1
+                    and qc_matrix is not None
+                    and all(
+                        z in z_index and self._is_matrix_row(a, qc_matrix)
+                        for z, a in qc_rows.items()
+                    )
+                ):
+                    rows = [z_index[z] for z in qc_rows]
+                    if isinstance(selection, slice):
+                        qc_matrix[rows, selection] = status_code
+                    else:
+                        qc_matrix[np.ix_(rows, selection)] = status_code
+                else:
+                    for qc_array in qc_rows.values():
+                        qc_array[selection] = status_code
+                
+                changes_made += n_selected * len(qc_rows)
+                changed_keys.update((source, z, var) for z in qc_rows)
         
         if changes_made > 0:
             self._btn_undo.config(state="normal")
             
             # Update the plots to show new QC markers
-            self._refresh_qc_markers()
+            self._refresh_qc_markers(changed_keys)
     
         self._clear_selection()
     
+    def _ensure_qc_array(
+        self, source_cache: dict, var: str, z
+    ) -> tuple[np.ndarray | None, list]:
+        """Return the cached QC array for (var, z), creating it if missing.
+        
+        Also returns the heights whose QC arrays were created by this call,
+        which is every height of var when a QC matrix is built. The common
+        case (array already exists) costs two dict lookups. The array is None
+        if the base variable itself is not cached.
+        """
+        qc_var = f"{var}{QCFLAG_SUFFIX}"
+        qc_arrays = source_cache["vars"].get(qc_var)
+        if qc_arrays is not None and z in qc_arrays:
+            return qc_arrays[z], []
+        
+        data = source_cache["vars"].get(var, {}).get(z)
+        if data is None:
+            return None, []
+        
+        # Give a matrix-backed variable a matching QC matrix, so all its
+        # heights can be flagged with a single write
+        matrix = source_cache["matrix"].get(var)
+        if not qc_arrays and matrix is not None and self._is_matrix_row(data, matrix):
+            z_values = list(source_cache["z_index"][var])
+            qc_matrix = np.ones(matrix.shape, dtype=np.int8)
+            self._cache_var_matrix(source_cache, qc_var, qc_matrix, z_values)
+            return source_cache["vars"][qc_var][z], z_values
+        
+        qc_arrays = source_cache["vars"].setdefault(qc_var, {})
+        qc_arrays[z] = np.ones(data.shape, dtype=np.int8)  # Default to 1 (Auto-Pass)
+        return qc_arrays[z], [z]
+    
     def _undo_last_change(self):
         """Undo the last QC change."""
         if not self._last_qc_backup:
@@ -601,6 +814,8 @@ def _undo_last_change(self):
             return
         
         # Restore from backup
+        restored_keys = set()
+        n_skipped = 0
         for source, vars_dict in self._last_qc_backup.items():
             if source not in self._source_data_cache:
                 continue
@@ -608,43 +823,65 @@ def _undo_last_change(self):
             source_cache = self._source_data_cache[source]
             
             for var, z_dict in vars_dict.items():
-                qc_var = f"{var}_qc_flag"
+                qc_var = f"{var}{QCFLAG_SUFFIX}"
                 
                 if qc_var not in source_cache["vars"]:
                     continue
                 
                 for z, backup_data in z_dict.items():
-                    source_cache["vars"][qc_var][z] = backup_data
+                    qc_array = source_cache["vars"][qc_var].get(z)
+                    if qc_array is None or qc_array.shape != backup_data.shape:
+                        n_skipped += 1
+                        continue
+                    # Restore in place, so plotted and memoised references stay valid
+                    np.copyto(qc_array, backup_data, casting="no")
+                    restored_keys.add((source, z, var))
         
         self._last_qc_backup.clear()
         self._btn_undo.config(state="disabled")
         
         # Refresh plots
-        self._refresh_qc_markers()
+        self._refresh_qc_markers(restored_keys)
         
-        messagebox.showinfo("Undo Complete", "Last QC change has been undone.")
+        if n_skipped:
+            messagebox.showwarning(
+                "Undo Incomplete",
+                f"{n_skipped} QC series changed since the last QC change "
+                "and could not be restored.",
+            )
+        else:
+            messagebox.showinfo("Undo Complete", "Last QC change has been undone.")
     
-    def _refresh_qc_markers(self):
-        """Refresh QC markers on all plots without full redraw."""
-        # Save current view limits
-        xlim = self.axes[0].get_xlim()
-        ylims = [ax.get_ylim() for ax in self.axes]
+    def _refresh_qc_markers(self, keys: set | None = None):
+        """Refresh QC markers on all plots without full redraw.
+        
+        If keys is given, only lines whose (source, z, var) is in keys are
+        refreshed; the markers of all other lines are left untouched.
+        """
+        if keys is not None and not keys:
+            return
+        
+        # The QC flags of the refreshed keys have changed
+        if keys is None:
+            self._qc_group_memo.clear()
+        else:
+            for key in keys:
+                self._qc_group_memo.pop(key, None)
+        
+        # Newly created scatters can autoscale an axes; set_offsets never does.
+        # Limits only need saving while autoscaling is still on somewhere.
+        keep_limits = any(
+            ax.get_autoscalex_on() or ax.get_autoscaley_on() for ax in self.axes
+        )
+        if keep_limits:
+            xlim = self.axes[0].get_xlim()
+            ylims = [ax.get_ylim() for ax in self.axes]
         
         # Update only the scatter plots (QC markers) without clearing lines
         for line_key, artists in self._plot_lines.items():
             source, z, var, panel_idx = line_key
-            
-            # Remove old scatter if exists
-            if len(artists) > 1 and artists[1] is not None:
-                artists[1].remove()
-                artists[1] = None
-            # Remove additional scatters if they exist
-            for i in range(2, len(artists)):
-                if artists[i] is not None:
-                    artists[i].remove()
-            # Reset to just line and one scatter placeholder
-            self._plot_lines[line_key] = [artists[0], None]
-            artists = self._plot_lines[line_key]
+            if keys is not None and (source, z, var) not in keys:
+                continue
             
             # Get updated QC data
             cached = self._get_cached_data(source, z, var)
@@ -652,60 +889,179 @@ def _refresh_qc_markers(self):
                 continue
             
             time, data, qc_data = cached
+            if qc_data is None:
+                continue
             
-            # Add new scatters based on QC values
-            if qc_data is not None:
-                scatters = self._create_qc_scatters(self.axes[panel_idx], time, data, qc_data)
-                if scatters:
-                    artists[1] = scatters[0] if scatters else None
-                    # Store additional scatters
-                    self._plot_lines[line_key] = [artists[0]] + scatters
+            # Move the existing marker collections to the new QC points
+            artists[1:] = self._create_qc_scatters(
+                self.axes[panel_idx], time, data, qc_data, artists[1:],
+                key=(source, z, var),
+            )
         
         # Restore view limits
-        for ax in self.axes:
-            ax.set_xlim(xlim)
-        for i, ax in enumerate(self.axes):
-            ax.set_ylim(ylims[i])
+        if keep_limits:
+            self.axes[0].set_xlim(xlim)
+            for ax, ylim in zip(self.axes, ylims):
+                ax.set_ylim(ylim)
         
         self.canvas.draw_idle()
     
-    def _create_qc_scatters(self, ax, time, data, qc_data):
-        """Create scatter plots for different QC status categories based on settings."""
-        scatters = []
+    def _create_qc_scatters(
+        self,
+        ax,
+        time,
+        data,
+        qc_data,
+        scatters: list | None = None,
+        key: tuple | None = None,
+    ) -> list:
+        """Create or update scatter plots for the QC status marker groups.
+        
+        Returns one entry per marker group (None where a group has no points).
+        If scatters from a previous call are given, they are updated in place
+        with set_offsets rather than recreated. If key (source, z, var) is
+        given, the classification of qc_data is memoised under it.
+        """
+        if not scatters:
+            scatters = [None] * len(self._marker_groups)
         
-        # Group QC codes by their marker style
-        marker_groups = {}
-        for code, info in self._status_mapping_config.items():
-            marker = info.get("marker")
-            if marker is None:
-                continue
-            
-            # Create a hashable key from marker properties
-            color = marker.get("color", "black")
-            edgecolor = marker.get("edgecolor", color)
-            marker_key = (color, edgecolor)
-            
-            if marker_key not in marker_groups:
-                marker_groups[marker_key] = []
-            marker_groups[marker_key].append(int(code))
+        group_indices = self._qc_group_memo.get(key) if key is not None else None
+        if group_indices is None:
+            group_indices = self._classify_qc(qc_data)
+            if key is not None:
+                self._qc_group_memo[key] = group_indices
         
         # Create scatter plots for each marker group
-        for (color, edgecolor), codes in marker_groups.items():
-            mask = np.isin(qc_data, codes)
-            if mask.any():
-                scatter = ax.scatter(
-                    time[mask], 
-                    data[mask],
+        for gid, ((color, edgecolor), _) in enumerate(self._marker_groups):
+            idx = group_indices[gid]
+            has_points = idx.size > 0
+            
+            if scatters[gid] is not None:
+                scatters[gid].set_offsets(np.column_stack((time[idx], data[idx])))
+                scatters[gid].set_visible(has_points)
+            elif has_points:
+                scatters[gid] = ax.scatter(
+                    time[idx], 
+                    data[idx],
                     color=color,
                     edgecolors=edgecolor,
                     linewidths=0.5 if color != edgecolor else 0,
                     s=3,
                     zorder=5
                 )
-                scatters.append(scatter)
         
         return scatters
     
+    def _classify_qc(self, qc_data: np.ndarray) -> list:
+        """Return the sample indices of each QC marker group in qc_data."""
+        # For int8 QC arrays, classify every sample into its marker group with
+        # one lookup-table pass instead of an np.isin sort per group; other
+        # dtypes fall back to np.isin
+        if qc_data.dtype == np.int8:
+            group_ids = self._marker_lut[qc_data.view(np.uint8)]
+            n_groups = len(self._marker_groups)
+            return [np.flatnonzero(group_ids == gid) for gid in range(n_groups)]
+        return [
+            np.flatnonzero(np.isin(qc_data, codes)) for _, codes in self._marker_groups
+        ]
+    
+    # ---------- LINE DECIMATION ----------
+    
+    def _on_xlim_changed(self, ax):
+        """Re-decimate all plotted lines for the new x-range of the shared axes."""
+        xlim = ax.get_xlim()
+        if xlim == self._decimated_xlim:
+            return
+        self._decimated_xlim = xlim
+        self._decimate_lines(list(self._plot_lines), xlim)
+    
+    def _on_canvas_resize(self, event=None):
+        """Re-decimate all plotted lines for the new pixel width of the axes."""
+        self._decimate_lines(list(self._plot_lines), self.axes[0].get_xlim())
+    
+    def _decimate_lines(self, line_keys, xlim: tuple[float, float]):
+        """Set the data of each line to a min/max-decimated view of xlim.
+        
+        Each line gets about twice as many buckets as its axes is wide in
+        pixels. Only lines with sorted time are decimated; others keep all
+        samples.
+        """
+        x0, x1 = xlim
+        for line_key in line_keys:
+            artists = self._plot_lines.get(line_key)
+            if not artists:
+                continue
+            
+            source, z, var, panel_idx = line_key
+            if not self._source_data_cache[source].get("time_sorted"):
+                continue
+            
+            cached = self._get_cached_data(source, z, var)
+            if cached is None:
+                continue
+            
+            time, data, _ = cached
+            if data.shape != time.shape:
+                continue
+            
+            n_buckets = max(int(2 * self.axes[panel_idx].bbox.width), 1)
+            artists[0].set_data(*self._decimate(time, data, x0, x1, n_buckets))
+    
+    @staticmethod
+    def _decimate(
+        time: np.ndarray, data: np.ndarray, x0: float, x1: float, n_buckets: int
+    ):
+        """Reduce the samples in [x0, x1] to a (min, max) pair per bucket.
+        
+        time must be sorted. One sample beyond each edge is kept so the line
+        runs to the axes border. Ranges with fewer than four samples per
+        bucket are returned undecimated.
+        """
+        i0 = max(np.searchsorted(time, x0, side="left") - 1, 0)
+        i1 = min(np.searchsorted(time, x1, side="right") + 1, time.size)
+        t = time[i0:i1]
+        d = data[i0:i1]
+        
+        bucket = t.size // n_buckets
+        if bucket < 4:
+            return t, d
+        
+        m = bucket * n_buckets
+        tb = t[:m].reshape(n_buckets, bucket)
+        db = d[:m].reshape(n_buckets, bucket)
+        # fmin/fmax ignore NaN unless a whole bucket is NaN, which keeps gaps
+        t_out = np.column_stack((tb[:, 0], tb[:, -1])).ravel()
+        d_min = np.fmin.reduce(db, axis=1)
+        d_max = np.fmax.reduce(db, axis=1)
+        d_out = np.column_stack((d_min, d_max)).ravel()
+        return np.concatenate((t_out, t[m:])), np.concatenate((d_out, d[m:]))
+    
+    def _relim_full_data(self, panel_idx: int):
+        """Recompute data limits of a panel from the full data of its lines.
+        
+        Plotted lines may only hold a decimated window of their data, so the
+        limits of every line on the panel are added from the cached arrays.
+        """
+        ax = self.axes[panel_idx]
+        ax.relim()
+        for (source, z, var, p_idx) in self._plot_lines:
+            if p_idx != panel_idx:
+                continue
+            
+            cached = self._get_cached_data(source, z, var)
+            time_range = self._source_data_cache[source].get("time_range")
+            if cached is None or time_range is None:
+                continue
+            
+            data = cached[1]
+            finite = data[np.isfinite(data)]
+            if finite.size == 0:
+                continue
+            
+            ax.update_datalim(
+                [(time_range[0], finite.min()), (time_range[1], finite.max())]
+            )
+    
     # ---------- Y-RANGE METHODS ----------
     
     def _on_y_lock_toggle(self, panel_idx: int):
@@ -757,51 +1113,36 @@ def _compute_time_bounds(self):
         if not self._source_data_cache:
             return
         
-        all_times = []
-        for source_cache in self._source_data_cache.values():
-            time = source_cache.get("time")
-            if time is not None:
-                # Time should already be in matplotlib date numbers from _preextract_dataset
-                all_times.append(time)
+        # Per-source extrema are cached by _preextract_dataset
+        ranges = [
+            source_cache["time_range"]
+            for source_cache in self._source_data_cache.values()
+            if source_cache.get("time_range") is not None
+        ]
         
-        if not all_times:
+        if not ranges:
             return
         
-        # Combine all times
-        combined_time = np.concatenate(all_times)
-        
-        self._time_min_num = float(np.min(combined_time))
-        self._time_max_num = float(np.max(combined_time))
+        self._time_min_num = min(tmin for tmin, _ in ranges)
+        self._time_max_num = max(tmax for _, tmax in ranges)
     
-    def _get_current_window_span(self) -> float | None:
-        """Return the current x window span from panel 1 (axes[0])."""
+    def _get_time_bounds(self) -> tuple[float, float, float] | None:
+        """Return (tmin, tmax, span) of all loaded time, or None if span is empty."""
         if self._time_min_num is None or self._time_max_num is None:
             self._compute_time_bounds()
-        if self._time_min_num is None or self._time_max_num is None:
-            return None
-        
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
+        tmin, tmax = self._time_min_num, self._time_max_num
+        if tmin is None or tmax is None or tmax <= tmin:
             return None
-        
-        x0, x1 = self.axes[0].get_xlim()
-        window_span = x1 - x0
-        if window_span <= 0 or window_span > span_global:
-            window_span = span_global
-        return window_span
+        return tmin, tmax, tmax - tmin
     
-    def _update_time_slider_from_axes(self):
-        """Update the time slider based on the current x-limits of panel 1."""
-        if self._time_min_num is None or self._time_max_num is None:
-            self._compute_time_bounds()
-        if self._time_min_num is None or self._time_max_num is None:
+    def _update_time_slider_from_axes(self, xlim: tuple[float, float] | None = None):
+        """Update the time slider based on xlim, or the current x-limits of panel 1."""
+        bounds = self._get_time_bounds()
+        if bounds is None:
             return
+        tmin, _, span_global = bounds
         
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
-            return
-        
-        x0, x1 = self.axes[0].get_xlim()
+        x0, x1 = xlim if xlim is not None else self.axes[0].get_xlim()
         window_span = x1 - x0
         if window_span <= 0 or window_span >= span_global:
             self._time_slider.set(0)
@@ -812,22 +1153,20 @@ def _update_time_slider_from_axes(self):
             self._time_slider.set(0)
             return
         
-        pos = (x0 - self._time_min_num) / denom
+        pos = (x0 - tmin) / denom
         pos = max(0.0, min(1.0, pos))
         self._time_slider.set(int(pos * 1000))
     
-    def _update_window_controls_from_axes(self):
-        """Sync window slider and entry with current window width."""
-        if self._time_min_num is None or self._time_max_num is None:
-            self._compute_time_bounds()
-        if self._time_min_num is None or self._time_max_num is None:
-            return
-        
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
+    def _update_window_controls_from_axes(
+        self, xlim: tuple[float, float] | None = None
+    ):
+        """Sync window slider and entry with the window width of xlim, or of panel 1."""
+        bounds = self._get_time_bounds()
+        if bounds is None:
             return
+        span_global = bounds[2]
         
-        x0, x1 = self.axes[0].get_xlim()
+        x0, x1 = xlim if xlim is not None else self.axes[0].get_xlim()
         window_span = x1 - x0
         if window_span <= 0:
             return
@@ -839,40 +1178,55 @@ def _update_window_controls_from_axes(self):
         self._window_slider.set(int(min(max(percent, 1.0), 100.0)))
         self._window_var.set(f"{frac:.4g}")
     
+    def _throttle_slider(self, handler, value):
+        """Call handler with the latest slider value at most once per 16 ms (~60 Hz)."""
+        pending = self._slider_pending.get(handler)
+        if pending is None:
+            after_id = self.after(16, lambda: self._flush_slider(handler))
+            self._slider_pending[handler] = [after_id, value]
+        else:
+            pending[1] = value
+    
+    def _flush_slider(self, handler):
+        """Apply a pending slider value now, e.g. when the slider is released."""
+        pending = self._slider_pending.pop(handler, None)
+        if pending is None:
+            return
+        after_id, value = pending
+        self.after_cancel(after_id)
+        handler(value)
+    
     def _on_time_slider_move(self, value):
         """Move the visible time window along the time axis, keeping current window width."""
         # Skip if no data loaded yet
         if not self._source_data_cache:
             return
         
-        if self._time_min_num is None or self._time_max_num is None:
-            self._compute_time_bounds()
-            if self._time_min_num is None:
-                return
-        
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
+        bounds = self._get_time_bounds()
+        if bounds is None:
             return
+        tmin, _, span_global = bounds
         
-        window_span = self._get_current_window_span()
-        if window_span is None:
-            return
-        window_span = max(1e-9, min(window_span, span_global))
+        x0, x1 = self.axes[0].get_xlim()
+        window_span = x1 - x0
+        if window_span <= 0 or window_span > span_global:
+            window_span = span_global
+        window_span = max(1e-9, window_span)
         
         pos = float(value) / 1000.0
         pos = max(0.0, min(1.0, pos))
         
         if span_global == window_span:
-            left = self._time_min_num
+            left = tmin
         else:
-            left = self._time_min_num + pos * (span_global - window_span)
+            left = tmin + pos * (span_global - window_span)
         right = left + window_span
         
-        for ax in self.axes:
-            ax.set_xlim(left, right)
+        # The panels share x, so setting panel 1 moves them all. The
+        # AutoDateLocators set by _apply_datetime_formatting follow the
+        # view, so the tick formatting does not need to be reapplied.
+        self.axes[0].set_xlim(left, right)
         
-        # Update datetime formatting for new time range
-        self._apply_datetime_formatting()
         self._apply_locked_y_ranges()
         self.canvas.draw_idle()
     
@@ -886,14 +1240,10 @@ def _shift_time_window(self, direction: int):
         if not self._source_data_cache:
             return
         
-        if self._time_min_num is None or self._time_max_num is None:
-            self._compute_time_bounds()
-            if self._time_min_num is None:
-                return
-        
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
+        bounds = self._get_time_bounds()
+        if bounds is None:
             return
+        tmin, tmax, span_global = bounds
         
         x0, x1 = self.axes[0].get_xlim()
         window_span = x1 - x0
@@ -906,33 +1256,26 @@ def _shift_time_window(self, direction: int):
         right = left + window_span
         
         # Clamp to bounds
-        if left < self._time_min_num:
-            left = self._time_min_num
+        if left < tmin:
+            left = tmin
             right = left + window_span
-        if right > self._time_max_num:
-            right = self._time_max_num
+        if right > tmax:
+            right = tmax
             left = right - window_span
         
-        for ax in self.axes:
-            ax.set_xlim(left, right)
+        self.axes[0].set_xlim(left, right)
         
-        # Update datetime formatting for new time range
-        self._apply_datetime_formatting()
-        self._update_time_slider_from_axes()
-        self._update_window_controls_from_axes()
+        self._update_time_slider_from_axes((left, right))
+        self._update_window_controls_from_axes((left, right))
         self._apply_locked_y_ranges()
         self.canvas.draw_idle()
     
     def _apply_window_fraction(self, frac: float):
         """Apply a new window width (fraction of global span) around current center."""
-        if self._time_min_num is None or self._time_max_num is None:
-            self._compute_time_bounds()
-            if self._time_min_num is None:
-                return
-        
-        span_global = self._time_max_num - self._time_min_num
-        if span_global <= 0:
+        bounds = self._get_time_bounds()
+        if bounds is None:
             return
+        tmin, tmax, span_global = bounds
         
         x0, x1 = self.axes[0].get_xlim()
         center = 0.5 * (x0 + x1)
@@ -947,20 +1290,17 @@ def _apply_window_fraction(self, frac: float):
         right = center + window_span / 2.0
         
         # Clamp to bounds
-        if left < self._time_min_num:
-            left = self._time_min_num
+        if left < tmin:
+            left = tmin
             right = left + window_span
-        if right > self._time_max_num:
-            right = self._time_max_num
+        if right > tmax:
+            right = tmax
             left = right - window_span
         
-        for ax in self.axes:
-            ax.set_xlim(left, right)
+        self.axes[0].set_xlim(left, right)
         
-        # Update datetime formatting for new time range
-        self._apply_datetime_formatting()
-        self._update_time_slider_from_axes()
-        self._update_window_controls_from_axes()
+        self._update_time_slider_from_axes((left, right))
+        self._update_window_controls_from_axes((left, right))
         self._apply_locked_y_ranges()
         self.canvas.draw_idle()
     
@@ -1026,14 +1366,38 @@ def _load_dataset_from_file(self):
         if not filepath:
             return
         
+        # Read the file on the worker thread and poll for completion from Tk
+        future = self._io_pool.submit(xr.load_dataset, filepath)
+        self._set_loading(True)
+        self.after(50, lambda: self._check_load(future, filepath))
+    
+    def _check_load(self, future, filepath: str):
+        """Finish loading a dataset once the background read has completed."""
+        if not future.done():
+            self.after(50, lambda: self._check_load(future, filepath))
+            return
+        
+        self._set_loading(False)
+        
         try:
-            ds = xr.load_dataset(filepath)
+            ds = future.result()
             identifier = os.path.splitext(os.path.basename(filepath))[0]
             self.register_dataset(ds, identifier)
             self._last_loaded_dataset = identifier
             self._show_selection_dialog()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load dataset:\n{e}")
+    
+    def _set_loading(self, loading: bool):
+        """Toggle the loading indicator and block new loads while one is running."""
+        if loading:
+            self._file_menu.entryconfig("Load Dataset", state="disabled")
+            self._load_progress.pack(side=tk.LEFT, padx=(0, 5))
+            self._load_progress.start(10)
+        else:
+            self._load_progress.stop()
+            self._load_progress.pack_forget()
+            self._file_menu.entryconfig("Load Dataset", state="normal")
 
     def _save_dataset_to_file(self):
         """Open dialog to select dataset and save it with QC modifications."""
@@ -1083,33 +1447,62 @@ def _save_dataset_to_file(self):
 
     
     def _show_dataset_selection_dialog(self, dataset_names: list) -> str | None:
-        """Show a dialog to select which dataset to save."""
+        """Show a dialog to select which dataset to save.
+        
+        The dialog is built on first use and withdrawn instead of destroyed,
+        so later saves only refresh the combobox values.
+        """
+        dialog = self._save_dialog
+        if dialog is None:
+            dialog = self._save_dialog = self._build_save_dialog()
+        
+        self._save_dialog_combo["values"] = dataset_names
+        self._save_dialog_var.set(dataset_names[0])
+        self._save_dialog_result = None
+        
+        # Center dialog on parent
+        dialog.deiconify()
+        dialog.update_idletasks()
+        x = self.winfo_rootx() + (self.winfo_width() - dialog.winfo_width()) // 2
+        y = self.winfo_rooty() + (self.winfo_height() - dialog.winfo_height()) // 2
+        dialog.geometry(f"+{x}+{y}")
+        dialog.grab_set()
+        
+        # Block until OK/Cancel writes the done flag
+        self.wait_variable(self._save_dialog_done)
+        
+        dialog.grab_release()
+        dialog.withdraw()
+        return self._save_dialog_result
+    
+    def _build_save_dialog(self) -> tk.Toplevel:
+        """Create the (initially hidden) dataset selection dialog used by save."""
         dialog = tk.Toplevel(self)
+        dialog.withdraw()
         dialog.title("Select Dataset to Save")
         dialog.geometry("300x150")
         dialog.transient(self)
-        dialog.grab_set()
         
-        result = {"selected": None}
+        self._save_dialog_var = tk.StringVar()
+        self._save_dialog_done = tk.BooleanVar(value=False)
         
         tk.Label(dialog, text="Select dataset to save:", font=("Arial", 10)).pack(pady=10)
         
-        selected_var = tk.StringVar(value=dataset_names[0])
-        combo = ttk.Combobox(
+        self._save_dialog_combo = ttk.Combobox(
             dialog,
-            textvariable=selected_var,
-            values=dataset_names,
+            textvariable=self._save_dialog_var,
             state="readonly",
             width=30
         )
-        combo.pack(pady=5)
+        self._save_dialog_combo.pack(pady=5)
         
         def on_ok():
-            result["selected"] = selected_var.get()
-            dialog.destroy()
+            self._save_dialog_result = self._save_dialog_var.get()
+            self._save_dialog_done.set(True)
         
         def on_cancel():
-            dialog.destroy()
+            self._save_dialog_result = None
+            self._save_dialog_done.set(True)
         
         btn_frame = tk.Frame(dialog)
         btn_frame.pack(pady=15)
@@ -1117,14 +1510,10 @@ def on_cancel():
         tk.Button(btn_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=5)
         
-        # Center dialog on parent
-        dialog.update_idletasks()
-        x = self.winfo_rootx() + (self.winfo_width() - dialog.winfo_width()) // 2
-        y = self.winfo_rooty() + (self.winfo_height() - dialog.winfo_height()) // 2
-        dialog.geometry(f"+{x}+{y}")
+        # Closing the window counts as cancel and keeps the dialog alive
+        dialog.protocol("WM_DELETE_WINDOW", on_cancel)
         
-        self.wait_window(dialog)
-        return result["selected"]
+        return dialog
     
     def _save_dataset_with_qc(self, dataset_name: str, filepath: str, save_only_selected_vars: bool = False):
         """Save dataset with updated QC flags from cache.
@@ -1140,13 +1529,24 @@ def _save_dataset_with_qc(self, dataset_name: str, filepath: str, save_only_sele
             the selection dialog (present in self._user_selections).
             Default is False (save all variables).
         """
-        # Get the original dataset
-        ds = self._manager.datasets[dataset_name].copy(deep=True)
+        # Shallow copy of the original dataset; only the QC variables, which
+        # are written in place below, get their own data
+        ds = self._manager.datasets[dataset_name].copy(deep=False)
+        for var_name in list(ds.data_vars):
+            if var_name.endswith(QCFLAG_SUFFIX):
+                ds[var_name] = ds[var_name].copy(deep=True)
         ds_info = self._manager.get_dataset_info(dataset_name)
         shape_type = ds_info["shape_type"]
         series_dim = ds_info["series_dim"]
         source_dim = ds_info["source_dim"]
         
+        # Value -> position maps for the extra dimensions, built once per save
+        coord_index = {
+            dim: {val: i for i, val in enumerate(ds[dim].values.tolist())}
+            for dim in (series_dim, source_dim)
+            if dim is not None
+        }
+        
         # Update QC flags from cache based on dataset structure
         if shape_type == "time_only":
             # Single source dataset
@@ -1156,112 +1556,85 @@ def _save_dataset_with_qc(self, dataset_name: str, filepath: str, save_only_sele
         elif shape_type == "time_plus_1":
             if series_dim == "source":
                 # Dataset split by source dimension - reconstruct all sources
-                source_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
+                source_values = ds[series_dim].values.tolist()
                 for source in source_values:
-                    self._update_qc_for_source(ds, source, shape_type, series_dim, None, "all")
+                    self._update_qc_for_source(
+                        ds, source, shape_type, series_dim, None, "all", coord_index
+                    )
             else:
                 # Normal series dimension
                 source_name = ds.attrs.get("source", dataset_name)
-                series_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
+                series_values = ds[series_dim].values.tolist()
+                done_series = self._update_qc_matrices_for_source(
+                    ds, source_name, series_dim, None, coord_index
+                )
                 for series_val in series_values:
-                    self._update_qc_for_source(ds, source_name, shape_type, series_dim, None, series_val)
+                    self._update_qc_for_source(
+                        ds, source_name, shape_type, series_dim, None, series_val,
+                        coord_index, done_series,
+                    )
         
         else:  # time_plus_2
             # Both source and series dimensions
-            source_values = [self._manager._to_python_type(v) for v in ds[source_dim].values]
-            series_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
+            source_values = ds[source_dim].values.tolist()
+            series_values = ds[series_dim].values.tolist()
             for source in source_values:
+                done_series = self._update_qc_matrices_for_source(
+                    ds, source, series_dim, source_dim, coord_index
+                )
                 for series_val in series_values:
-                    self._update_qc_for_source(ds, source, shape_type, series_dim, source_dim, series_val)
+                    self._update_qc_for_source(
+                        ds, source, shape_type, series_dim, source_dim, series_val,
+                        coord_index, done_series,
+                    )
         
         # Filter variables if requested
         if save_only_selected_vars:
-            # Build set of selected variables and heights from user_selections
+            # Build set of selected variables and heights from user_selections,
+            # plus per-source and global variable-name sets for O(1) lookups
             selected_vars_heights = set()
+            selected_vars_by_source: dict[str, set[str]] = {}
             
             for source, z_vars in self._user_selections.items():
+                source_vars = selected_vars_by_source.setdefault(source, set())
                 for z, var_list in z_vars.items():
                     for var in var_list:
                         # Add the variable (which might be base or _qcflag)
                         selected_vars_heights.add((source, z, var))
+                        source_vars.add(var)
+            
+            selected_vars = set().union(*selected_vars_by_source.values())
             
             # Determine which variables to keep based on dataset structure
             all_vars = list(ds.data_vars)
-            vars_to_keep = set()
             
             if shape_type == "time_only":
                 # For time-only datasets, keep variables that match any selection
                 source_name = ds.attrs.get("source", dataset_name)
-                for var in all_vars:
-                    # Check if this variable was selected
-                    var_selected = False
-                    for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                        if sel_source == source_name and sel_var == var:
-                            var_selected = True
-                            break
-                    
-                    if var_selected:
-                        vars_to_keep.add(var)
-                        # Also keep its QC flag if it exists
-                        if not var.endswith("_qcflag"):
-                            qc_var = f"{var}_qcflag"
-                            if qc_var in all_vars:
-                                vars_to_keep.add(qc_var)
+                candidate_vars = selected_vars_by_source.get(source_name, set())
             
             elif shape_type == "time_plus_1":
                 if series_dim == "source":
-                    # Source dimension - need to filter by source and variable
-                    for var in all_vars:
-                        var_selected = False
-                        for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                            if sel_var == var:
-                                var_selected = True
-                                break
-                        
-                        if var_selected:
-                            vars_to_keep.add(var)
-                            # Also keep its QC flag if it exists
-                            if not var.endswith("_qcflag"):
-                                qc_var = f"{var}_qcflag"
-                                if qc_var in all_vars:
-                                    vars_to_keep.add(qc_var)
+                    # Source dimension - keep variables selected for any source
+                    candidate_vars = selected_vars
                 else:
                     # Height/level dimension - need to slice by series values
                     source_name = ds.attrs.get("source", dataset_name)
-                    selected_series_vals = set()
-                    
-                    for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                        if sel_source == source_name:
-                            selected_series_vals.add(sel_z)
+                    selected_series_vals = {
+                        sel_z for (sel_source, sel_z, sel_var) in selected_vars_heights
+                        if sel_source == source_name
+                    }
                     
                     if selected_series_vals:
                         # Slice dataset to only include selected series values
                         ds = ds.sel({series_dim: list(selected_series_vals)})
                     
-                    # Keep all variables that were selected
-                    for var in all_vars:
-                        var_selected = False
-                        for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                            if sel_source == source_name and sel_var == var:
-                                var_selected = True
-                                break
-                        
-                        if var_selected:
-                            vars_to_keep.add(var)
-                            # Also keep its QC flag if it exists
-                            if not var.endswith("_qcflag"):
-                                qc_var = f"{var}_qcflag"
-                                if qc_var in all_vars:
-                                    vars_to_keep.add(qc_var)
+                    candidate_vars = selected_vars_by_source.get(source_name, set())
             
             else:  # time_plus_2
                 # Need to filter both dimensions
-                selected_sources = set()
-                selected_series_vals = set()
-                
-                for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                    selected_sources.add(sel_source)
-                    selected_series_vals.add(sel_z)
+                selected_sources = {src for (src, _, _) in selected_vars_heights}
+                selected_series_vals = {z for (_, z, _) in selected_vars_heights}
                 
                 if selected_sources and selected_series_vals:
                     # Slice dataset to only include selected sources and series values
@@ -1270,21 +1643,18 @@ def _save_dataset_with_qc(self, dataset_name: str, filepath: str, save_only_sele
                         series_dim: list(selected_series_vals)
                     })
                 
-                # Keep all variables that were selected
-                for var in all_vars:
-                    var_selected = False
-                    for (sel_source, sel_z, sel_var) in selected_vars_heights:
-                        if sel_var == var:
-                            var_selected = True
-                            break
-                    
-                    if var_selected:
-                        vars_to_keep.add(var)
-                        # Also keep its QC flag if it exists
-                        if not var.endswith("_qcflag"):
-                            qc_var = f"{var}_qcflag"
-                            if qc_var in all_vars:
-                                vars_to_keep.add(qc_var)
+                candidate_vars = selected_vars
+            
+            # Keep selected variables, plus their QC flag if it exists
+            vars_to_keep = set()
+            all_vars_set = set(all_vars)
+            for var in all_vars:
+                if var in candidate_vars:
+                    vars_to_keep.add(var)
+                    if not var.endswith(QCFLAG_SUFFIX):
+                        qc_var = f"{var}{QCFLAG_SUFFIX}"
+                        if qc_var in all_vars_set:
+                            vars_to_keep.add(qc_var)
             
             # Drop unselected variables
             vars_to_drop = [var for var in ds.data_vars if var not in vars_to_keep]
@@ -1297,11 +1667,16 @@ def _save_dataset_with_qc(self, dataset_name: str, filepath: str, save_only_sele
         if save_only_selected_vars:
             ds.attrs["qc_filtered"] = "Only selected variables and heights"
         
-        # Save to file
-        ds.to_netcdf(filepath)
+        # QC variables created here are written as compressed bytes
+        original_vars = self._manager.datasets[dataset_name].data_vars
+        encoding: dict[Hashable, dict[str, Any]] = {
+            var: {"dtype": "i1", "zlib": True, "complevel": 1}
+            for var in ds.data_vars
+            if var.endswith(QCFLAG_SUFFIX) and var not in original_vars
+        }
         
         # Save to file
-        ds.to_netcdf(filepath)
+        ds.to_netcdf(filepath, engine=NETCDF_ENGINE, encoding=encoding)
 
     def _update_qc_for_source(
         self, 
@@ -1310,7 +1685,9 @@ def _update_qc_for_source(
         shape_type: str,
         series_dim: str | None,
         source_dim: str | None,
-        series_val: str | int | float
+        series_val: str | int | float,
+        coord_index: dict | None = None,
+        done_series: set | None = None
     ):
         """Update QC variables in dataset for a specific source and series value.
         
@@ -1328,40 +1705,40 @@ def _update_qc_for_source(
             Name of source dimension
         series_val : str | int | float
             Series value to update ("all" for source-split datasets)
+        coord_index : dict | None, optional
+            Mapping {dim: {coordinate value: position}} for series_dim and
+            source_dim. Built from ds if not given.
+        done_series : set | None, optional
+            (QC variable, series value) pairs already written for this source
+            by _update_qc_matrices_for_source, which are skipped here.
         """
         if source not in self._source_data_cache:
             return
         
+        if coord_index is None:
+            coord_index = {
+                dim: {val: i for i, val in enumerate(ds[dim].values.tolist())}
+                for dim in (series_dim, source_dim)
+                if dim is not None
+            }
+        
         source_cache = self._source_data_cache[source]
         
         for var_name, series_dict in source_cache["vars"].items():
-            if not var_name.endswith("_qcflag"):
+            if not var_name.endswith(QCFLAG_SUFFIX):
                 continue
             
             if series_val not in series_dict:
                 continue
             
+            if done_series and (var_name, series_val) in done_series:
+                continue
+            
             qc_array = series_dict[series_val]
-            base_var = var_name.replace("_qcflag", "")
             
             # Create QC variable if it doesn't exist
-            if var_name not in ds.data_vars:
-                if base_var not in ds.data_vars:
-                    continue
-                
-                # Create with same dimensions and shape as base variable
-                base_dims = ds[base_var].dims
-                shape = ds[base_var].shape
-                qc_data = np.ones(shape, dtype=int)
-                ds[var_name] = (base_dims, qc_data)
-                
-                # Add QC flag attributes
-                ds[var_name].attrs['long_name'] = f"QC flag for {base_var}"
-                ds[var_name].attrs['flag_values'] = list(self._status_mapping_config.keys())
-                ds[var_name].attrs['flag_meanings'] = ' '.join([
-                    info['label'].replace(' ', '_') 
-                    for info in self._status_mapping_config.values()
-                ])
+            if not self._ensure_qc_variable(ds, var_name):
+                continue
             
             try:
                 dims = ds[var_name].dims
@@ -1373,7 +1750,7 @@ def _update_qc_for_source(
                 elif shape_type == "time_plus_1":
                     if series_dim == "source":
                         # Find index of this source in the source dimension
-                        source_idx = list(ds[series_dim].values).index(source)
+                        source_idx = coord_index[series_dim][source]
                         
                         # Assign based on dimension order
                         if series_dim == dims[0]:
@@ -1385,25 +1762,133 @@ def _update_qc_for_source(
                         if series_val == "all":
                             ds[var_name].values[:] = qc_array
                         else:
-                            series_idx = list(ds[series_dim].values).index(series_val)
+                            series_idx = coord_index[series_dim][series_val]
                             if series_dim == dims[0]:
                                 ds[var_name].values[series_idx, :] = qc_array
                             else:
                                 ds[var_name].values[:, series_idx] = qc_array
                 
                 else:  # time_plus_2
-                    source_idx = list(ds[source_dim].values).index(source)
-                    series_idx = list(ds[series_dim].values).index(series_val)
+                    source_idx = coord_index[source_dim][source]
+                    series_idx = coord_index[series_dim][series_val]
                     
                     # Build slice tuple based on dimension order
-                    dim_order = {d: i for i, d in enumerate(dims)}
                     slices = [slice(None)] * len(dims)
-                    slices[dim_order[source_dim]] = source_idx
-                    slices[dim_order[series_dim]] = series_idx
+                    slices[dims.index(source_dim)] = source_idx
+                    slices[dims.index(series_dim)] = series_idx
                     ds[var_name].values[tuple(slices)] = qc_array
             
-            except (ValueError, IndexError) as e:
+            except (KeyError, ValueError, IndexError) as e:
                 print(f"Warning: Could not update {var_name} for source={source}, series={series_val}: {e}")
+    
+    def _update_qc_matrices_for_source(
+        self,
+        ds: xr.Dataset,
+        source: str,
+        series_dim: str,
+        source_dim: str | None,
+        coord_index: dict
+    ) -> set[tuple[str, Any]]:
+        """Write the cached QC matrices of a source into ds, one write per variable.
+        
+        Parameters
+        ----------
+        ds : xr.Dataset
+            Dataset to update (modified in place)
+        source : str
+            Source identifier from cache
+        series_dim : str
+            Name of series dimension
+        source_dim : str | None
+            Name of source dimension, None for time_plus_1 datasets
+        coord_index : dict
+            Mapping {dim: {coordinate value: position}} for series_dim and
+            source_dim
+        
+        Returns
+        -------
+        set[tuple[str, Any]]
+            (QC variable, series value) pairs that were written. Heights
+            outside a variable's matrix, and variables whose rows are not all
+            backed by the matrix, are left to _update_qc_for_source.
+        """
+        done_series: set[tuple[str, Any]] = set()
+        source_cache = self._source_data_cache.get(source)
+        if source_cache is None:
+            return done_series
+        
+        time_dim = self._manager.time_dim
+        if source_dim is not None:
+            target_dims: tuple = (source_dim, series_dim, time_dim)
+        else:
+            target_dims = (series_dim, time_dim)
+        
+        for var_name, qc_matrix in source_cache["matrix"].items():
+            if not var_name.endswith(QCFLAG_SUFFIX):
+                continue
+            
+            # Every cached row must still be a view of the matrix
+            series_dict = source_cache["vars"][var_name]
+            z_index = source_cache["z_index"][var_name]
+            if any(
+                series_dict.get(z) is None
+                or not self._is_matrix_row(series_dict[z], qc_matrix)
+                for z in z_index
+            ):
+                continue
+            
+            if not self._ensure_qc_variable(ds, var_name):
+                continue
+            
+            dims = ds[var_name].dims
+            if set(dims) != set(target_dims):
+                continue
+            
+            try:
+                rows = [coord_index[series_dim][z] for z in z_index]
+                
+                # View of the variable's values ordered as (source, series, time)
+                values = np.moveaxis(
+                    ds[var_name].values,
+                    [dims.index(d) for d in target_dims],
+                    range(len(target_dims)),
+                )
+                if source_dim is not None:
+                    values = values[coord_index[source_dim][source]]
+                values[rows] = qc_matrix
+            
+            except (KeyError, ValueError, IndexError) as e:
+                print(f"Warning: Could not update {var_name} for source={source}: {e}")
+                continue
+            
+            done_series.update((var_name, z) for z in z_index)
+        
+        return done_series
+    
+    def _ensure_qc_variable(self, ds: xr.Dataset, var_name: str) -> bool:
+        """Create QC variable var_name in ds if missing.
+        
+        Returns False if its base variable is absent from ds.
+        """
+        if var_name in ds.data_vars:
+            return True
+        
+        base_var = var_name.replace(QCFLAG_SUFFIX, "")
+        if base_var not in ds.data_vars:
+            return False
+        
+        # Create with same dimensions and shape as base variable
+        base_dims = ds[base_var].dims
+        shape = ds[base_var].shape
+        qc_data = np.ones(shape, dtype=np.int8)
+        ds[var_name] = (base_dims, qc_data)
+        
+        # Add QC flag attributes
+        ds[var_name].attrs['long_name'] = f"QC flag for {base_var}"
+        flag_values = np.asarray(self._qc_flag_values, dtype=np.int8)
+        ds[var_name].attrs['flag_values'] = flag_values
+        ds[var_name].attrs['flag_meanings'] = self._qc_flag_meanings
+        return True
             
     def register_dataset(self, ds: xr.Dataset, identifier: str):
         """Register a dataset using the DatasetManager."""
@@ -1412,11 +1897,29 @@ def register_dataset(self, ds: xr.Dataset, identifier: str):
             self._last_loaded_dataset = identifier
             self._dataset_count += 1
             
+            # Index the sources of the dataset for the info popups
+            ds = self._manager.datasets[identifier]
+            if "source" in ds.dims:
+                sources = ds["source"].values.tolist()
+            else:
+                sources = [ds.attrs.get("source", identifier)]
+            for source in sources:
+                names = self._source_datasets.setdefault(source, [])
+                if identifier not in names:
+                    names.append(identifier)
+            
         except ValueError as e:
             messagebox.showerror("Validation Error", str(e))
     
     def _preextract_dataset(self, ds, dataset_name: str) -> None:
         """Pre-extract dataset information based on its structure."""
+        # Cached arrays of existing sources may be replaced below
+        self._cached_data_memo.clear()
+        self._qc_group_memo.clear()
+        # The backup no longer matches the cached QC arrays
+        self._last_qc_backup.clear()
+        self._btn_undo.config(state="disabled")
+        
         ds_info = self._manager.get_dataset_info(dataset_name)
         shape_type = ds_info["shape_type"]
         series_dim = ds_info["series_dim"]
@@ -1433,25 +1936,126 @@ def _preextract_dataset(self, ds, dataset_name: str) -> None:
             if series_dim == "source":
                 # Split by source, series is always "all"
                 series_values = ["all"]
-                source_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
+                source_values = ds[series_dim].values.tolist()
             else:
                 # Normal series dimension
-                series_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
+                series_values = ds[series_dim].values.tolist()
                 # Use dataset name or source attribute instead of "default"
                 source_name = ds.attrs.get("source", dataset_name)
                 source_values = [source_name]
         else:  # time_plus_2
             # Two extra dimensions - series_dim and source_dim
-            series_values = [self._manager._to_python_type(v) for v in ds[series_dim].values]
-            source_values = [self._manager._to_python_type(v) for v in ds[source_dim].values]
+            series_values = ds[series_dim].values.tolist()
+            source_values = ds[source_dim].values.tolist()
+        
+        # Extract data into cache based on structure. Datasets sharing a time
+        # axis reuse its converted values instead of converting them again.
+        raw_time = ds[self._manager.time_dim].values
+        time_key = (
+            raw_time.dtype.str,
+            raw_time.shape,
+            raw_time[:1].tobytes(),
+            raw_time[-1:].tobytes(),
+        )
+        cached_time = self._time_conv_cache.get(time_key)
+        if cached_time is not None and np.array_equal(cached_time[0], raw_time):
+            time_values, time_sorted, time_range = cached_time[1:]
+        else:
+            time_values, time_sorted, time_range = self._convert_time_values(ds)
+            self._time_conv_cache[time_key] = (
+                raw_time, time_values, time_sorted, time_range
+            )
         
-        # Extract data into cache based on structure
+        # Values of each variable, read once and ordered so that a source, and
+        # for series variables its (series, time) block, is taken by position
+        source_pos = {source: i for i, source in enumerate(source_values)}
+        var_views = {}
+        if shape_type == "time_plus_1" and series_dim == "source":
+            for var in ds.data_vars:
+                da = ds[var]
+                if series_dim in da.dims:
+                    series_axis = da.dims.index(series_dim)
+                    var_views[var] = np.moveaxis(da.values, series_axis, 0)
+        elif shape_type != "time_only":
+            if shape_type == "time_plus_2":
+                lead_dims: tuple = (source_dim, series_dim)
+            else:
+                lead_dims = (series_dim,)
+            for var in ds.data_vars:
+                view = self._series_view(ds[var], lead_dims)
+                if view is not None:
+                    var_views[var] = view
+        
+        for source in source_values:
+            if source not in self._source_data_cache:
+                self._source_data_cache[source] = {
+                    "time": time_values,
+                    "time_range": time_range,
+                    "time_sorted": time_sorted,
+                    "vars": {},
+                    "matrix": {},
+                    "z_index": {},
+                }
+            else:
+                self._source_data_cache[source]["time"] = time_values
+                self._source_data_cache[source]["time_range"] = time_range
+                self._source_data_cache[source]["time_sorted"] = time_sorted
+            
+            source_cache = self._source_data_cache[source]
+            for var in ds.data_vars:
+                if var not in self._source_data_cache[source]["vars"]:
+                    self._source_data_cache[source]["vars"][var] = {}
+                
+                view = var_views.get(var)
+                if shape_type == "time_plus_1" and series_dim == "source":
+                    # Extract data for this source as a view of the variable
+                    if view is not None:
+                        source_cache["vars"][var]["all"] = view[source_pos[source]]
+                    continue
+                
+                # Series variables are stored as one (n_series, n_time) matrix
+                if view is not None:
+                    if shape_type == "time_plus_2":
+                        matrix = view[source_pos[source]]
+                    else:
+                        matrix = view
+                    self._cache_var_matrix(source_cache, var, matrix, series_values)
+                    continue
+                
+                for series_val in series_values:
+                    if shape_type == "time_only":
+                        data = ds[var].values
+                        self._source_data_cache[source]["vars"][var]["all"] = data
+                    elif shape_type == "time_plus_1":
+                        # Normal series extraction
+                        try:
+                            data = ds[var].sel({series_dim: series_val}).values
+                            self._source_data_cache[source]["vars"][var][series_val] = data
+                        except Exception:
+                            pass
+                    else:  # time_plus_2
+                        try:
+                            data = ds[var].sel({source_dim: source, series_dim: series_val}).values
+                            self._source_data_cache[source]["vars"][var][series_val] = data
+                        except Exception:
+                            pass
+
+        # Update global time bounds after caching
+        self._compute_time_bounds()
+    
+    def _convert_time_values(
+        self, ds
+    ) -> tuple[np.ndarray, bool, tuple[float, float] | None]:
+        """Return (time, is_sorted, (tmin, tmax)) for the time axis of ds.
+        
+        Time is returned as read-only Matplotlib date numbers where possible.
+        """
         time_values = ds[self._manager.time_dim].values
         
         # Convert time to matplotlib date numbers if needed
         if np.issubdtype(time_values.dtype, np.datetime64):
             # Already datetime, convert to matplotlib date numbers
-            time_values = mdates.date2num(pd.to_datetime(time_values))
+            time_values = mdates.date2num(time_values)
         elif np.issubdtype(time_values.dtype, np.number):
             # Numeric time - check if it looks like Unix timestamps
             # If values are large (> year 1900 in seconds), treat as Unix timestamps
@@ -1469,17 +2073,15 @@ def _preextract_dataset(self, ds, dataset_name: str) -> None:
                             time_values = mdates.date2num(decoded_time)
                         except Exception as e:
                             # Fallback: assume days since 1900-01-01
-                            reference_date = pd.Timestamp('1900-01-01')
-                            decoded_time = reference_date + pd.to_timedelta(time_values, unit='D')
-                            time_values = mdates.date2num(decoded_time)
+                            days_1900 = self._epoch_offset_days('1900-01-01')
+                            time_values = time_values + days_1900
                     else:
                         # Fallback: assume days since 1900-01-01
-                        reference_date = pd.Timestamp('1900-01-01')
-                        decoded_time = reference_date + pd.to_timedelta(time_values, unit='D')
-                        time_values = mdates.date2num(decoded_time)
+                        days_1900 = self._epoch_offset_days('1900-01-01')
+                        time_values = time_values + days_1900
                 elif min_val >= 1e9:  # Likely Unix timestamp in seconds
-                    decoded_time = pd.to_datetime(time_values, unit='s')
-                    time_values = mdates.date2num(decoded_time)
+                    unix_epoch = self._epoch_offset_days('1970-01-01')
+                    time_values = time_values / 86400.0 + unix_epoch
                 else:
                     # Could be days since Unix epoch or other format
                     # Try as days since 1970-01-01
@@ -1490,44 +2092,75 @@ def _preextract_dataset(self, ds, dataset_name: str) -> None:
                         # Last fallback: treat as matplotlib date numbers already
                         pass
         
-        for source in source_values:
-            if source not in self._source_data_cache:
-                self._source_data_cache[source] = {"time": time_values, "vars": {}}
+        # Store time as float64 Matplotlib date numbers, so QC and plotting
+        # code can use it directly without converting it again
+        if np.issubdtype(time_values.dtype, np.number):
+            time_values = np.asarray(time_values, dtype=np.float64)
+        
+        # Shared by every source and line of this dataset, so guard it
+        # against in-place edits (a view keeps the dataset's own array writable)
+        time_values = time_values.view()
+        time_values.flags.writeable = False
+        
+        # Sorted time lets QC selections be resolved with a binary search
+        time_sorted = bool(
+            np.issubdtype(time_values.dtype, np.number)
+            and np.all(np.diff(time_values) >= 0)
+        )
+        
+        # Time extrema are computed once here instead of on every bounds update;
+        # for sorted time they are simply the first and last samples
+        time_range = None
+        if time_values.size > 0:
+            if time_sorted:
+                time_range = (float(time_values[0]), float(time_values[-1]))
             else:
-                self._source_data_cache[source]["time"] = time_values
-            
-            for var in ds.data_vars:
-                if var not in self._source_data_cache[source]["vars"]:
-                    self._source_data_cache[source]["vars"][var] = {}
-                
-                for series_val in series_values:
-                    if shape_type == "time_only":
-                        data = ds[var].values
-                        self._source_data_cache[source]["vars"][var]["all"] = data
-                    elif shape_type == "time_plus_1":
-                        if series_dim == "source":
-                            # Extract data for this source
-                            try:
-                                data = ds[var].sel({series_dim: source}).values
-                                self._source_data_cache[source]["vars"][var]["all"] = data
-                            except Exception:
-                                pass
-                        else:
-                            # Normal series extraction
-                            try:
-                                data = ds[var].sel({series_dim: series_val}).values
-                                self._source_data_cache[source]["vars"][var][series_val] = data
-                            except Exception:
-                                pass
-                    else:  # time_plus_2
-                        try:
-                            data = ds[var].sel({source_dim: source, series_dim: series_val}).values
-                            self._source_data_cache[source]["vars"][var][series_val] = data
-                        except Exception:
-                            pass
-
-        # Update global time bounds after caching
-        self._compute_time_bounds()
+                time_range = (float(np.min(time_values)), float(np.max(time_values)))
+        
+        return time_values, time_sorted, time_range
+    
+    @staticmethod
+    def _epoch_offset_days(origin: str) -> float:
+        """Return the Matplotlib date number of midnight on origin (YYYY-MM-DD)."""
+        offset = np.datetime64(origin) - np.datetime64(mdates.get_epoch())
+        return float(offset / np.timedelta64(1, "D"))
+    
+    def _series_view(self, da: xr.DataArray, lead_dims: tuple) -> np.ndarray | None:
+        """Return the values of da ordered as (*lead_dims, time).
+        
+        Returns None if da has other dims.
+        """
+        order = (*lead_dims, self._manager.time_dim)
+        if set(da.dims) != set(order):
+            return None
+        source_axes = [da.dims.index(d) for d in order]
+        return np.moveaxis(da.values, source_axes, range(len(order)))
+    
+    @staticmethod
+    def _cache_var_matrix(
+        source_cache: dict, var: str, matrix: np.ndarray, z_values
+    ) -> None:
+        """Cache a (z, time) matrix for var and expose each row as its per-z array.
+        
+        The rows stored under source_cache["vars"][var] are views, so writes
+        through either the matrix or a row are seen by both. A C-contiguous
+        matrix is stored as is, without copying the dataset's values.
+        """
+        if not matrix.flags.c_contiguous:
+            matrix = np.ascontiguousarray(matrix)
+        source_cache["matrix"][var] = matrix
+        source_cache["z_index"][var] = {z: i for i, z in enumerate(z_values)}
+        source_cache["vars"].setdefault(var, {}).update(zip(z_values, matrix))
+    
+    @staticmethod
+    def _is_matrix_row(row: np.ndarray, matrix: np.ndarray) -> bool:
+        """Return True if row is a view into the memory of matrix.
+        
+        numpy collapses view chains, so a row of a matrix that is itself a
+        view of the dataset's values has the values' owner as its base.
+        """
+        owner = matrix if matrix.base is None else matrix.base
+        return row.base is owner and np.may_share_memory(row, matrix)
 
     def _get_source_z_vars_for_dataset(self, identifier: str) -> dict:
         """Get source -> z -> vars dict for a specific dataset only."""
@@ -1576,6 +2209,7 @@ def _handle_selection(self, chosen_items: dict, clip_to_range: bool = False):
             ds = self._manager.datasets[self._last_loaded_dataset]
             self._preextract_dataset(ds, self._last_loaded_dataset)
         
+        selections_changed = False
         for source, z_vars in chosen_items.items():
             if source not in self._user_selections:
                 self._user_selections[source] = {}
@@ -1585,6 +2219,9 @@ def _handle_selection(self, chosen_items: dict, clip_to_range: bool = False):
                 for var in var_list:
                     if var not in self._user_selections[source][z]:
                         self._user_selections[source][z].append(var)
+                        selections_changed = True
+                        if not var.endswith(QCFLAG_SUFFIX):
+                            self._selected_data_vars.setdefault(source, set()).add(var)
                         key = (source, z, var)
                         if key not in self._plot_config:
                             self._plot_config[key] = {
@@ -1592,7 +2229,10 @@ def _handle_selection(self, chosen_items: dict, clip_to_range: bool = False):
                                 "panels": [False] * self._num_panels
                             }
         
-        self._rebuild_variable_panel()
+        # Selections only ever grow, so the panel is already up to date
+        # unless something new was chosen
+        if selections_changed:
+            self._rebuild_variable_panel()
     
     def _apply_time_clipping(self, identifier: str):
         """Clip a dataset to the reference time range and update it in the manager."""
@@ -1604,12 +2244,17 @@ def _apply_time_clipping(self, identifier: str):
             # Regenerate nested dict for clipped dataset
             ds_info = self._manager._dataset_info[identifier]
             self._manager._nested_dicts[identifier] = self._manager._generate_nested_dict(clipped_ds, ds_info, identifier)
+            self._manager.invalidate_qc_flag_map(identifier)
             
         except Exception as e:
             messagebox.showwarning("Clipping Warning", f"Could not clip dataset: {e}")
     
     def _get_cached_data(self, source: str, z, var: str) -> tuple[np.ndarray, np.ndarray, np.ndarray | None] | None:
         """Get pre-extracted data from cache."""
+        memo_key = (source, z, var)
+        if memo_key in self._cached_data_memo:
+            return self._cached_data_memo[memo_key]
+        
         if source not in self._source_data_cache:
             return None
         
@@ -1622,38 +2267,35 @@ def _get_cached_data(self, source: str, z, var: str) -> tuple[np.ndarray, np.nda
         data = source_cache["vars"][var][z]
         
         # Get QC data if available
-        qc_var = f"{var}_qcflag"
+        qc_var = f"{var}{QCFLAG_SUFFIX}"
         qc_data = None
         if qc_var in source_cache["vars"] and z in source_cache["vars"][qc_var]:
             qc_data = source_cache["vars"][qc_var][z]
         
+        self._cached_data_memo[memo_key] = (time, data, qc_data)
         return time, data, qc_data
     
     def _random_color(self) -> str:
-        """Generate a random hex color."""
-        return "#{:06x}".format(random.randint(0, 0xFFFFFF))
+        """Return a random hex color, refilling the pool 64 colors at a time."""
+        if not self._color_pool:
+            batch = self._rng.integers(50, 201, size=(64, 3), dtype=np.uint8)
+            self._color_pool = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in batch.tolist()]
+        return self._color_pool.pop()
     
     def _rebuild_variable_panel(self):
-        """Rebuild the left panel with variable controls."""
+        """Rebuild the left panel with variable controls.
+        
+        Height rows are only built for expanded variables.
+        """
         for widget in self._var_inner_frame.winfo_children():
             widget.destroy()
+        for config in self._plot_config.values():
+            config.pop("color_btn", None)
         
         row = 0
         
-        # Only show sources that have selected variables (not empty)
-        sources_with_data = []
-        for source in sorted(self._user_selections.keys()):
-            # Check if this source has any non-QC variables selected
-            has_variables = False
-            for z, var_list in self._user_selections[source].items():
-                for var in var_list:
-                    if not var.endswith("_qcflag"):
-                        has_variables = True
-                        break
-                if has_variables:
-                    break
-            if has_variables:
-                sources_with_data.append(source)
+        # Only show sources that have non-QC variables selected
+        sources_with_data = sorted(self._selected_data_vars)
         
         for source in sources_with_data:
             # Source header with info button - make it visually distinct
@@ -1684,17 +2326,31 @@ def _rebuild_variable_panel(self):
             
             z_vars = self._user_selections[source]
             
-            all_vars = sorted(set(
-                v for var_list in z_vars.values() 
-                for v in var_list 
-                if not v.endswith("_qcflag")
-            ))
+            all_vars = sorted(self._selected_data_vars[source])
+            
+            # Heights of each variable, from one pass over the selections
+            var_heights: dict[str, list] = {}
+            for z, var_list in z_vars.items():
+                for v in var_list:
+                    var_heights.setdefault(v, []).append(z)
             
             for var in all_vars:
-                # Variable header with info button
+                expanded = (source, var) in self._expanded_vars
+                
+                # Variable header with expand and info buttons
                 var_frame = tk.Frame(self._var_inner_frame)
                 var_frame.grid(row=row, column=0, columnspan=5 + self._num_panels, sticky="w", pady=(5, 1))
                 
+                expand_btn = tk.Button(
+                    var_frame,
+                    text="▾" if expanded else "▸",
+                    width=2,
+                    font=("Arial", 7),
+                    relief="flat",
+                    command=lambda s=source, v=var: self._toggle_variable_rows(s, v)
+                )
+                expand_btn.pack(side=tk.LEFT)
+                
                 var_label = tk.Label(
                     var_frame,
                     text=f"{var} ",
@@ -1715,6 +2371,9 @@ def _rebuild_variable_panel(self):
                 
                 row += 1
                 
+                if not expanded:
+                    continue
+                
                 # Column headers
                 tk.Label(self._var_inner_frame, text="Height", width=6, anchor="w").grid(
                     row=row, column=0, sticky="w", padx=(20, 2)
@@ -1729,14 +2388,17 @@ def _rebuild_variable_panel(self):
                     )
                 row += 1
                 
-                heights_with_var = sorted([z for z, vlist in z_vars.items() if var in vlist])
+                heights_with_var = sorted(var_heights.get(var, ()))
                 
                 for z in heights_with_var:
                     key = (source, z, var)
-                    config = self._plot_config.get(key, {
-                        "color": self._random_color(), 
-                        "panels": [False] * self._num_panels
-                    })
+                    config = self._plot_config.get(key)
+                    if config is None:
+                        config = {
+                            "color": self._random_color(),
+                            "panels": [False] * self._num_panels
+                        }
+                        self._plot_config[key] = config
                     
                     tk.Label(self._var_inner_frame, text=str(z), width=6, anchor="w").grid(
                         row=row, column=0, sticky="w", padx=(20, 2)
@@ -1760,7 +2422,7 @@ def _rebuild_variable_panel(self):
                         command=lambda k=key: self._pick_color(k)
                     )
                     color_btn.grid(row=row, column=2, padx=1)
-                    self._plot_config[key]["color_btn"] = color_btn
+                    config["color_btn"] = color_btn
                     
                     # Panel checkboxes
                     for p_idx in range(self._num_panels):
@@ -1771,41 +2433,32 @@ def _rebuild_variable_panel(self):
                             command=lambda k=key, idx=p_idx, v=var_bool: self._toggle_panel(k, idx, v)
                         )
                         cb.grid(row=row, column=3 + p_idx)
-                        self._plot_config[key][f"panel_var_{p_idx}"] = var_bool
+                        config[f"panel_var_{p_idx}"] = var_bool
                     
                     row += 1
     
+    def _toggle_variable_rows(self, source: str, var: str):
+        """Show or hide the height rows of a variable in the left panel."""
+        self._expanded_vars ^= {(source, var)}
+        self._rebuild_variable_panel()
+    
     def _show_source_info(self, source: str):
         """Show a popup with source/dataset attributes."""
-        # Find which dataset contains this source
+        # First loaded dataset that contains this source
         attrs = {}
-        for ds_name, ds in self._manager.datasets.items():
-            if "source" in ds.dims:
-                if source in ds["source"].values:
-                    attrs = dict(ds.attrs)
-                    attrs["_dataset_name"] = ds_name
-                    break
-            else:
-                ds_source = ds.attrs.get("source", ds_name)
-                if ds_source == source:
-                    attrs = dict(ds.attrs)
-                    attrs["_dataset_name"] = ds_name
-                    break
+        ds_names = self._source_datasets.get(source)
+        if ds_names:
+            attrs = dict(self._manager.datasets[ds_names[0]].attrs)
+            attrs["_dataset_name"] = ds_names[0]
         
         self._show_info_popup(f"Source: {source}", attrs)
     
     def _show_variable_info(self, source: str, var: str):
         """Show a popup with variable attributes."""
         attrs = {}
-        for ds_name, ds in self._manager.datasets.items():
-            # Check if this dataset has this source
-            has_source = False
-            if "source" in ds.dims:
-                has_source = source in ds["source"].values
-            else:
-                has_source = ds.attrs.get("source", ds_name) == source
-            
-            if has_source and var in ds.data_vars:
+        for ds_name in self._source_datasets.get(source, ()):
+            ds = self._manager.datasets[ds_name]
+            if var in ds.data_vars:
                 attrs = dict(ds[var].attrs)
                 attrs["_dtype"] = str(ds[var].dtype)
                 attrs["_dims"] = str(ds[var].dims)
@@ -1832,11 +2485,12 @@ def _show_info_popup(self, title: str, attrs: dict):
         text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=text.yview)
         
-        # Format attributes
+        # Format attributes as (chars, tags) pairs for a single Tk insert call
         if attrs:
+            chunks = []
             for key, value in sorted(attrs.items()):
-                text.insert(tk.END, f"{key}:\n", "key")
-                text.insert(tk.END, f"  {value}\n\n")
+                chunks += [f"{key}:\n", "key", f"  {value}\n\n", ""]
+            text.insert(tk.END, *chunks)
         else:
             text.insert(tk.END, "No attributes available.")
         
@@ -1856,10 +2510,9 @@ def _pick_color(self, key):
         """Open color picker for a variable-height combination."""
         current_color = self._plot_config[key]["color"]
         color = colorchooser.askcolor(color=current_color, title="Pick a color")
-        if color[1]:
-            self._plot_config[key]["color"] = color[1]
-            if "color_btn" in self._plot_config[key]:
-                self._plot_config[key]["color_btn"].config(bg=color[1])
+        # _update_line_color also updates the config and the button, so only
+        # call it when the color actually changed
+        if color[1] and color[1] != current_color:
             self._update_line_color(key, color[1])
     
     def _update_line_color(self, key, new_color):
@@ -1886,7 +2539,12 @@ def _update_line_color(self, key, new_color):
     
     def _toggle_panel(self, key, panel_idx, var_bool):
         """Update panel assignment for a variable-height combination."""
-        self._plot_config[key]["panels"][panel_idx] = var_bool.get()
+        panels = self._plot_config[key]["panels"]
+        panels[panel_idx] = var_bool.get()
+        if any(panels):
+            self._plotted_keys.add(key)
+        else:
+            self._plotted_keys.discard(key)
         self._update_single_line(key, panel_idx, var_bool.get())
     
     def _update_single_line(self, key, panel_idx, is_active):
@@ -1925,13 +2583,13 @@ def _update_single_line(self, key, panel_idx, is_active):
         # Create QC markers
         scatters = []
         if qc_data is not None:
-            scatters = self._create_qc_scatters(ax, time, data, qc_data)
+            scatters = self._create_qc_scatters(ax, time, data, qc_data, key=key)
         
         self._plot_lines[line_key] = [line] + scatters
         
         # Only autoscale if not locked
         if not self._y_lock_vars[panel_idx].get():
-            ax.relim()
+            self._relim_full_data(panel_idx)
             ax.autoscale_view()
         else:
             # Apply locked limits
@@ -1946,12 +2604,22 @@ def _update_single_line(self, key, panel_idx, is_active):
         # Otherwise, preserve the current view
         if not has_existing_data:
             if self._time_min_num is not None and self._time_max_num is not None:
-                for a in self.axes:
-                    a.set_xlim(self._time_min_num, self._time_max_num)
+                self.axes[0].set_xlim(self._time_min_num, self._time_max_num)
         else:
             # Restore the previous x-limits
-            for a in self.axes:
-                a.set_xlim(current_xlim)
+            self.axes[0].set_xlim(current_xlim)
+        
+        # The new line was plotted at full resolution
+        self._decimate_lines([line_key], self.axes[0].get_xlim())
+        
+        # Sync time controls and redraw once for a burst of toggles
+        if not self._line_refresh_pending:
+            self._line_refresh_pending = True
+            self.after_idle(self._flush_line_refresh)
+    
+    def _flush_line_refresh(self):
+        """Sync time controls and axis formatting after one or more line toggles."""
+        self._line_refresh_pending = False
         
         # Update time controls after plotting
         self._update_time_slider_from_axes()
@@ -1960,9 +2628,6 @@ def _update_single_line(self, key, panel_idx, is_active):
         # Compute time bounds before formatting
         self._compute_time_bounds()
         
-        # Reinitialize span selectors
-        self._init_span_selectors()
-        
         # Apply datetime formatting to x-axis after bounds are computed
         self._apply_datetime_formatting()
         
@@ -1970,9 +2635,10 @@ def _update_single_line(self, key, panel_idx, is_active):
     
     def _update_plot(self):
         """Full redraw of plot - used only when necessary."""
-        for ax in self.axes:
+        for ax, patch in zip(self.axes, self._selection_patches):
             ax.clear()
             ax.grid(True)
+            ax.add_artist(patch)
         
         for i, ax in enumerate(self.axes):
             ax.set_ylabel(f"Panel {i+1}")
@@ -1984,7 +2650,7 @@ def _update_plot(self):
         self._plot_lines.clear()
         
         for (source, z, var), config in self._plot_config.items():
-            if var.endswith("_qc_flag"):
+            if var.endswith(QCFLAG_SUFFIX):
                 continue
             
             panels = config["panels"]
@@ -2006,7 +2672,9 @@ def _update_plot(self):
                     
                     scatters = []
                     if qc_data is not None:
-                        scatters = self._create_qc_scatters(self.axes[p_idx], time, data, qc_data)
+                        scatters = self._create_qc_scatters(
+                            self.axes[p_idx], time, data, qc_data, key=(source, z, var)
+                        )
                     
                     line_key = (source, z, var, p_idx)
                     self._plot_lines[line_key] = [line] + scatters
@@ -2040,7 +2708,7 @@ def collect_panel_settings(self) -> dict[str, Any]:
         # Collect variable colors
         variable_colors = {}
         for (source, z, var), config in self._plot_config.items():
-            if not var.endswith("_qcflag"):
+            if not var.endswith(QCFLAG_SUFFIX):
                 key = f"{source}|{z}|{var}"
                 variable_colors[key] = config['color']
         
@@ -2194,9 +2862,6 @@ def load_panel_appearance(self):
             # Compute time bounds before formatting
             self._compute_time_bounds()
             
-            # Reinitialize span selectors
-            self._init_span_selectors()
-            
             # Apply datetime formatting to x-axis after bounds are computed
             self._apply_datetime_formatting()
             